@@ -0,0 +1,198 @@
+"""
+Parameter-level comparison of two sets of samples, e.g. two builds on the
+same plate.
+
+Samples are matched by grid cell (column and row), and every column the two
+sets share is compared across all matched cells at once, so comparing two
+whole plates costs a handful of array operations per column rather than a
+walk through two trees of records. Either set may come from a source, a
+table written with --table, or a directory of exported records (see
+pifify.io.rows.record_rows). Where both sets carry URNs, matched cells whose
+URNs agree hold identical records.
+
+    >>> from pifify.io.rows import rows, columns
+    >>> a = columns(rows([P005B001()], urn=False))
+    >>> b = columns(rows([P005B002()], urn=False))
+    >>> print diff(a, b, labels=('P005B001', 'P005B002')).table()
+"""
+
+from numbers import Real
+import numpy as np
+
+
+# columns that identify a record or its cell rather than describe a sample
+IGNORE = ('urn', 'source', 'col', 'row')
+
+
+def cell_keys(columns):
+    """Returns the grid cell, e.g. 'M16', of each row in COLUMNS."""
+    return np.array(['{}{:02d}'.format(col, int(row))
+                     for col, row in zip(columns['col'], columns['row'])])
+
+
+def _is_number(value):
+    return isinstance(value, (Real, np.number)) and \
+        not isinstance(value, (bool, np.bool_))
+
+
+def _close(a, b):
+    """Elementwise True where the numbers in A and B agree; NaN equals NaN."""
+    return np.isclose(a, b, rtol=1e-9, atol=0.0, equal_nan=True)
+
+
+def _differs(a, b):
+    """Elementwise True where A and B hold different values."""
+    if a.dtype.kind in 'biuf' and b.dtype.kind in 'biuf':
+        if a.dtype.kind == 'f' or b.dtype.kind == 'f':
+            return ~_close(a, b)
+        return a != b
+    # strings, or columns with missing values: compare as python objects,
+    # and any pair of numbers as numbers
+    a = a.astype(object)
+    b = b.astype(object)
+    result = np.asarray(a != b, dtype=bool)
+    numeric = np.fromiter((_is_number(x) and _is_number(y)
+                           for x, y in zip(a, b)),
+                          dtype=bool, count=len(a))
+    if numeric.any():
+        result[numeric] = ~_close(a[numeric].astype(float),
+                                  b[numeric].astype(float))
+    return result
+
+
+def _format(value):
+    if isinstance(value, (float, np.floating)):
+        return '{:g}'.format(value)
+    return '{}'.format(value)
+
+
+class ParameterDiff(object):
+    """
+    Differences between two sets of samples.
+
+    Attributes
+    ----------
+    :changes, list: (cell, field, a, b) for every field that differs in
+        a cell present in both sets, ordered by cell.
+    :fields, list: Fields that were compared.
+    :labels, tuple: Names of the two sets, used as table headings.
+    :matched, int: Number of cells present in both sets.
+    :only_a, :only_b, list: Cells present in only one of the sets.
+    :identical, int: Number of matched cells with the same URN, i.e.
+        identical records, or None if either set lacks URNs.
+    """
+
+    def __init__(self, changes, fields, matched, only_a, only_b,
+                 labels=('a', 'b'), identical=None):
+        self.changes = changes
+        self.fields = fields
+        self.matched = matched
+        self.only_a = only_a
+        self.only_b = only_b
+        self.labels = tuple(labels)
+        self.identical = identical
+
+    def __iter__(self):
+        for change in self.changes:
+            yield change
+
+    def __len__(self):
+        return len(self.changes)
+
+    def __str__(self):
+        return self.table()
+
+    @property
+    def cells(self):
+        """Cells, present in both sets, in which at least one field differs."""
+        return sorted(set(change[0] for change in self.changes))
+
+    def counts(self):
+        """Returns a dictionary of field : number of cells that differ."""
+        result = {}
+        for cell, field, a, b in self.changes:
+            result[field] = result.get(field, 0) + 1
+        return result
+
+    def table(self):
+        """Formats the differences as a compact, aligned text table."""
+        lines = [('cell', 'field') + self.labels]
+        lines.extend((cell, field, _format(a), _format(b))
+                     for cell, field, a, b in self.changes)
+        widths = [max(len(line[i]) for line in lines) for i in range(4)]
+        text = ['  '.join(entry.ljust(width)
+                          for entry, width in zip(line, widths)).rstrip()
+                for line in lines]
+        for label, cells in zip(self.labels, (self.only_a, self.only_b)):
+            if cells:
+                text.append('only in {}: {}'.format(label, ' '.join(cells)))
+        counts = self.counts()
+        text.append('{} of {} matched cells differ{}'.format(
+            len(self.cells), self.matched,
+            '' if not counts else ': ' + ', '.join(
+                '{} ({})'.format(field, counts[field])
+                for field in self.fields if field in counts)))
+        if self.identical is not None:
+            text.append('{} of {} matched cells hold identical records ' \
+                        '(same URN)'.format(self.identical, self.matched))
+        return '\n'.join(text)
+#end 'class ParameterDiff(object):'
+
+
+def diff(a, b, fields=None, labels=('a', 'b')):
+    """
+    Compares two sets of samples cell by cell.
+
+    Parameters
+    ----------
+    :a, :b, dict: Column arrays, as returned by pifify.io.rows.columns,
+        that include at least the col and row columns, and, to compare
+        records, the urn column.
+
+    Keywords
+    --------
+    :fields, list: Fields to compare. Default: every column shared by A
+        and B, except those in IGNORE.
+    :labels, tuple: Names of A and B. Default: ('a', 'b')
+
+    Return
+    ------
+    A ParameterDiff.
+    """
+    keys = []
+    for label, columns in zip(labels, (a, b)):
+        key = cell_keys(columns)
+        if len(np.unique(key)) != len(key):
+            raise ValueError('{} holds more than one sample per cell; ' \
+                             'select a single plate and build to ' \
+                             'compare.'.format(label))
+        keys.append(key)
+    ka, kb = keys
+    cells, ia, ib = np.intersect1d(ka, kb, assume_unique=True,
+                                   return_indices=True)
+    if fields is None:
+        fields = [name for name in a if name in b and name not in IGNORE]
+    else:
+        missing = [name for name in fields if name not in a or name not in b]
+        if missing:
+            raise ValueError('Cannot compare missing field(s): {}.'.format(
+                ', '.join(missing)))
+    fields = list(fields)
+    changes = []
+    if fields and len(cells):
+        # one row per field, one column per matched cell
+        mask = np.vstack([_differs(a[name][ia], b[name][ib])
+                          for name in fields])
+        # transpose so that changes are ordered by cell, then field
+        icell, ifield = np.nonzero(mask.T)
+        for i, j in zip(icell, ifield):
+            name = fields[j]
+            changes.append((cells[i], name, a[name][ia[i]], b[name][ib[i]]))
+    identical = None
+    if 'urn' in a and 'urn' in b:
+        identical = int(np.count_nonzero(
+            a['urn'][ia].astype(object) == b['urn'][ib].astype(object)))
+    return ParameterDiff(changes, fields, len(cells),
+                         list(np.setdiff1d(ka, kb)),
+                         list(np.setdiff1d(kb, ka)),
+                         labels=labels, identical=identical)
@@ -1,10 +1,12 @@
 from ...samples import FaustsonSample
+from .plate import Plate
+from collections import OrderedDict
 from itertools import product
 import os
 import json
 
 
-class CylinderPlate2mmX4mm(object):
+class CylinderPlate2mmX4mm(Plate):
     skip = ((ord('A'), 1), (ord('B'), 1), (ord('X'), 1), (ord('Y'), 1),
             (ord('A'), 2), (ord('Y'), 2),
             (ord('C'), 3), (ord('D'), 3), (ord('V'), 3), (ord('W'), 3),
@@ -33,133 +35,110 @@ class CylinderPlate2mmX4mm(object):
          0., 180., 270., 90.,
          0.,
          90., 45., 0.)))
+    sample_class = FaustsonSample
 
-    def __init__(self, *args, **kwds):
-        super(CylinderPlate2mmX4mm, self).__init__(*args, **kwds)
-        self.samples = []
+    def cells(self):
+        """Generates the (column, row) of every cell on the plate."""
         for col, row in product(xrange(ord('A'), ord('Y')+1),
                                 xrange(1, 25+1)):
             if (col, row) in self.skip:
                 continue
-            sample = FaustsonSample()
-            vpos, hpos = self.get_cartesian(row, col)
-            setattr(sample, 'RD', hpos)
-            setattr(sample, 'TD', vpos)
-            setattr(sample, 'col', chr(col))
-            setattr(sample, 'row', row)
-            setattr(sample, 'laserIndex', -1) # No explicit laser index
-            setattr(sample, 'innerSkinLaserPower', 0.0)
-            setattr(sample, 'innerSkinLaserSpeed', 0.0)
-            setattr(sample, 'innerSkinLaserSpot', 30.0)
-            setattr(sample, 'innerSkinOverlap', 0.15)
-            setattr(sample, 'nlayers', 195)
-            setattr(sample, 'polar', self.phi[row])
-            setattr(sample, 'powderSize', (10,45))
-            setattr(sample, 'plateMaterial', 'P20 steel')
-            setattr(sample, 'sieveCount', 0)
-            setattr(sample, 'skinLaserPower', 0.0)
-            setattr(sample, 'skinLaserSpeed', 0.0)
-            setattr(sample, 'skinLaserSpot', 30.0)
-            setattr(sample, 'skinOverlap', 0.16)
-            setattr(sample, 'azimuth', self.theta[row])
-            setattr(sample, 'virgin', 100.)
-            # done -- add the sample
-            self.samples.append(sample)
-
-    def __iter__(self):
-        for sample in self.samples:
-            yield sample
+            yield col, row
+
+    def cell_name(self, col, row):
+        return '{:s}{:02d}'.format(chr(col), row)
+
+    def cell_parameters(self, col, row):
+        params = OrderedDict()
+        vpos, hpos = self.get_cartesian(row, col)
+        params['RD'] = hpos
+        params['TD'] = vpos
+        params['col'] = chr(col)
+        params['row'] = row
+        params['laserIndex'] = -1 # No explicit laser index
+        params['innerSkinLaserPower'] = 0.0
+        params['innerSkinLaserSpeed'] = 0.0
+        params['innerSkinLaserSpot'] = 30.0
+        params['innerSkinOverlap'] = 0.15
+        params['nlayers'] = 195
+        params['polar'] = self.phi[row]
+        params['powderSize'] = (10,45)
+        params['plateMaterial'] = 'P20 steel'
+        params['sieveCount'] = 0
+        params['skinLaserPower'] = 0.0
+        params['skinLaserSpeed'] = 0.0
+        params['skinLaserSpot'] = 30.0
+        params['skinOverlap'] = 0.16
+        params['azimuth'] = self.theta[row]
+        params['virgin'] = 100.
+        return params
 
     def get_cartesian(self, row, col):
         cls = type(self)
         spacing = 11.54
         return (spacing*row, spacing*col)
-#end 'class CylinderPlate2mmX4mm(object):'
+#end 'class CylinderPlate2mmX4mm(Plate):'
 
 
 class P001B001(CylinderPlate2mmX4mm):
-    def __init__(self, *args, **kwds):
-        super(P001B001, self).__init__(*args, **kwds)
-        for sample in self:
-            setattr(sample, 'plate', 1)
-            setattr(sample, 'build', 1)
-            # annealed samples
-            sample.alloy.anneal(1253, duration=1, description='solution anneal')
-            sample.alloy.cool(1253, description='oven cool')
-            sample.alloy.anneal(993, duration=8, description='aging-1')
-            sample.alloy.cool(993, duration=2, Tstop=893, description='aging-2')
-            sample.alloy.anneal(893, duration=8, description='aging-3')
+    settings = (('plate', 1),
+                ('build', 1))
+    # annealed samples
+    treatment = (
+        ('anneal', (1253,), dict(duration=1, description='solution anneal')),
+        ('cool', (1253,), dict(description='oven cool')),
+        ('anneal', (993,), dict(duration=8, description='aging-1')),
+        ('cool', (993,), dict(duration=2, Tstop=893, description='aging-2')),
+        ('anneal', (893,), dict(duration=8, description='aging-3')))
 #end 'class P001B001(CylinderPlate2mmX4mm)'
 
 
 class P002B001(CylinderPlate2mmX4mm):
-    def __init__(self, *args, **kwds):
-        super(P002B001, self).__init__(*args, **kwds)
-        for sample in self:
-            setattr(sample, 'plate', 2)
-            setattr(sample, 'build', 1)
+    settings = (('plate', 2),
+                ('build', 1))
 #end 'class P002B001(CylinderPlate2mmX4mm)'
 
 
 class P003B001(CylinderPlate2mmX4mm):
-    def __init__(self, *args, **kwds):
-        super(P003B001, self).__init__(*args, **kwds)
-        for sample in self:
-            setattr(sample, 'plate', 3)
-            setattr(sample, 'build', 1)
+    settings = (('plate', 3),
+                ('build', 1))
 #end 'class P003B001(CylinderPlate2mmX4mm)'
 
 
 class P004B001(CylinderPlate2mmX4mm):
-    def __init__(self, *args, **kwds):
-        super(P004B001, self).__init__(*args, **kwds)
-        for sample in self:
-            setattr(sample, 'plate', 4)
-            setattr(sample, 'build', 1)
-            setattr(sample, 'virgin', 20.0)
-            setattr(sample, 'sieveCount', 2)
+    settings = (('plate', 4),
+                ('build', 1),
+                ('virgin', 20.0),
+                ('sieveCount', 2))
 #end 'class P004B001(CylinderPlate2mmX4mm)'
 
 
 class P005B001(CylinderPlate2mmX4mm):
-    def __init__(self, *args, **kwds):
-        super(P005B001, self).__init__(*args, **kwds)
-        for sample in self:
-            setattr(sample, 'plate', 5)
-            setattr(sample, 'build', 1)
-            setattr(sample, 'laserIndex', 1)
-            setattr(sample, 'virgin', 20.0)
-            setattr(sample, 'sieveCount', 2)
+    settings = (('plate', 5),
+                ('build', 1),
+                ('laserIndex', 1),
+                ('virgin', 20.0),
+                ('sieveCount', 2))
 #end 'class P005B001(CylinderPlate2mmX4mm)'
 
 
 class P006B001(CylinderPlate2mmX4mm):
-    def __init__(self, *args, **kwds):
-        super(P006B001, self).__init__(*args, **kwds)
-        for sample in self:
-            setattr(sample, 'plate', 6)
-            setattr(sample, 'build', 1)
-            setattr(sample, 'laserIndex', 2)
-            setattr(sample, 'virgin', 20.0)
-            setattr(sample, 'sieveCount', 2)
+    settings = (('plate', 6),
+                ('build', 1),
+                ('laserIndex', 2),
+                ('virgin', 20.0),
+                ('sieveCount', 2))
 #end 'class P006B001(CylinderPlate2mmX4mm)'
 
 
 class P005B002(CylinderPlate2mmX4mm):
+    settings = (('plate', 5),
+                ('build', 2))
+
     def __init__(self, *args, **kwds):
         super(P005B002, self).__init__(*args, **kwds)
         path = os.path.dirname(os.path.realpath(__file__))
         modfile = '{}/P005_B002-laser-settings.json'.format(path)
         with open(modfile, 'r') as ifs:
-            modifications = json.load(ifs)
-            print modifications.keys()[:5]
-            print modifications['M16']
-        for sample in self:
-            setattr(sample, 'plate', 5)
-            setattr(sample, 'build', 2)
-            col = sample.col().scalars
-            row = sample.row().scalars
-            key = '{:s}{:02d}'.format(col, int(row))
-            for k,v in iter(modifications[key].items()):
-                setattr(sample, k, float(v))
+            self.modifications = json.load(ifs)
 #end 'class P005B002(CylinderPlate2mmX4mm):'
@@ -0,0 +1,236 @@
+from abc import ABCMeta, abstractmethod
+
+from ...samples.validate import Validator, describe
+from ...materials.alloy import AlloyBase
+
+
+class Plate(object):
+    """
+    A build plate: a layout of cells, the parameters of each cell, and the
+    samples constructed from them.
+
+    This holds everything that does not depend on the layout: selection,
+    projection, lazy construction, validation and the per-cell overrides.
+    A layout subclasses it and defines the following; a layout without the
+    methods cannot be instantiated.
+
+        sample_class      the sample class, built on SampleMeta, which takes
+                          the omit keyword and declares the _domain of every
+                          parameter (see pifify.samples.validate), which
+                          validates them and types their columns in tables
+        cells()           generates the (column, row) of every cell
+        cell_name(c, r)   name of a cell, e.g. 'M16', as used by
+                          *modifications*
+        cell_parameters(c, r)
+                          ordered dictionary of the default parameters of a
+                          cell, keyed by sample_class attribute
+
+    Plates built this way work with every export path: streaming, tables,
+    diffs, validation and the shared parameter table used by worker
+    processes (see pifify.io.shared), which rebuilds samples through
+    sample_from.
+    """
+    __metaclass__ = ABCMeta
+    sample_class = None
+    # Plate-wide settings, as (attribute, value) pairs, applied on top of the
+    # defaults for every cell, e.g. plate and build numbers or powder reuse.
+    settings = ()
+    # Heat treatment applied to the alloy of every sample, as a sequence of
+    # (method, args, keywords) calls on the AlloyBase interface.
+    treatment = ()
+    # Per-cell overrides, keyed by cell name, e.g. 'M16', as in
+    # P005_B002-laser-settings.json. Applied after the plate-wide settings.
+    modifications = None
+
+    def __init__(self, select=None, omit=()):
+        """
+        Parameters
+        ----------
+        :select, callable: Selection (see pifify.io.select) evaluated
+            against the parameters of each cell. Only cells for which
+            SELECT returns True are turned into samples. Default: all cells.
+        :omit, iterable: Parameters (e.g. 'nlayers') or blocks of the record
+            (see the *blocks* of the sample class) to leave out of every
+            sample.
+        """
+        super(Plate, self).__init__()
+        self.check_keywords(select=select, omit=omit)
+        self.select = select
+        self.omit = frozenset(omit)
+        self._samples = None
+        self._selected = None
+
+    @classmethod
+    def check_keywords(cls, select=None, omit=()):
+        """
+        Raises a ValueError if SELECT or OMIT, as given to the plate, name
+        fields that its sample class does not have.
+        """
+        sample_class = cls.sample_class
+        unknown = set(omit).difference(sample_class._prep,
+                                       getattr(sample_class, 'blocks', ()))
+        if unknown:
+            raise ValueError('Cannot omit unrecognized field(s): {}.'.format(
+                ', '.join(sorted(unknown))))
+        unknown = set(getattr(select, 'keys', ())).difference(
+            sample_class._prep)
+        if unknown:
+            raise ValueError('Cannot select on unrecognized field(s): ' \
+                             '{}.'.format(', '.join(sorted(unknown))))
+
+    def __str__(self):
+        settings = dict(self.settings)
+        return '{}(plate={}, build={})'.format(
+            type(self).__name__, settings.get('plate'), settings.get('build'))
+
+    def __iter__(self):
+        # once .samples has been accessed, iterate over the stored samples;
+        # otherwise construct them one at a time, without keeping them.
+        if self._samples is not None:
+            for sample in self._samples:
+                yield sample
+        else:
+            for params in self.selected():
+                yield self.make_sample(params)
+
+    @property
+    def samples(self):
+        """Samples for the selected cells, constructed on first access."""
+        if self._samples is None:
+            self._samples = [self.make_sample(params)
+                             for params in self.selected()]
+        return self._samples
+
+    @staticmethod
+    def assign(params, key, value):
+        """
+        Sets KEY to VALUE in PARAMS. As with setting an attribute on a
+        sample, an existing entry is replaced and moves to the end.
+        """
+        params.pop(key, None)
+        params[key] = value
+
+    @abstractmethod
+    def cells(self):
+        """Generates the (column, row) of every cell on the plate."""
+
+    @abstractmethod
+    def cell_name(self, col, row):
+        """Name of the cell at COL, ROW, e.g. 'M16'."""
+
+    @abstractmethod
+    def cell_parameters(self, col, row):
+        """Default parameters of the cell at COL, ROW."""
+
+    def configure(self, params, cell):
+        """
+        Applies the plate-wide SETTINGS, then any MODIFICATIONS for CELL,
+        to the parameters of that cell.
+        """
+        for key, value in self.settings:
+            self.assign(params, key, value)
+        if self.modifications is not None:
+            for k,v in iter(self.modifications[cell].items()):
+                self.assign(params, k, float(v))
+
+    def parameters(self):
+        """
+        Returns the parameters of every cell on the plate, selected or not,
+        as a list of ordered dictionaries keyed by sample attribute.
+        No samples are constructed.
+        """
+        result = []
+        for col, row in self.cells():
+            params = self.cell_parameters(col, row)
+            self.configure(params, self.cell_name(col, row))
+            result.append(params)
+        return result
+
+    def problems(self):
+        """
+        Returns a list of the problems with the definition of the plate and
+        with the parameters of its cells, found without constructing any
+        samples. See pifify.samples.validate.
+        """
+        known = self.sample_class._prep
+        problems = []
+        unknown = [key for key, value in self.settings if key not in known]
+        if unknown:
+            problems.append('settings: unrecognized parameter(s) {}'.format(
+                ', '.join(unknown)))
+        for method, args, kwds in self.treatment:
+            if method.startswith('_') or \
+               not callable(getattr(AlloyBase, method, None)):
+                problems.append('treatment: "{}" is not a heat treatment ' \
+                                'step'.format(method))
+        cells = [self.cell_name(col, row) for col, row in self.cells()]
+        if self.modifications is not None:
+            missing = sorted(set(cells).difference(self.modifications))
+            if missing:
+                problems.append('modifications: no entry for {}'.format(
+                    describe(missing)))
+            extra = sorted(set(self.modifications).difference(cells))
+            if extra:
+                problems.append('modifications: {} not on the plate'.format(
+                    describe(extra)))
+            unknown, malformed = set(), []
+            for cell in sorted(set(cells).intersection(self.modifications)):
+                for k, v in self.modifications[cell].items():
+                    if k not in known:
+                        unknown.add(k)
+                    try:
+                        float(v)
+                    except (TypeError, ValueError):
+                        malformed.append('{}[{}]={!r}'.format(cell, k, v))
+            if unknown:
+                problems.append('modifications: unrecognized parameter(s) ' \
+                                '{}'.format(', '.join(sorted(unknown))))
+            if malformed:
+                problems.append('modifications: not a number, {}'.format(
+                    describe(malformed)))
+            if missing or malformed:
+                # the parameters of the plate cannot be computed
+                return problems
+        validator = Validator.compile(self.sample_class)
+        problems.extend(validator(self.parameters(), cells))
+        return problems
+
+    def selected(self):
+        """
+        Returns the parameters of the cells that pass the selection. They
+        are computed once and kept for the lifetime of the plate.
+        """
+        if self._selected is None:
+            if self.select is None:
+                self._selected = self.parameters()
+            else:
+                self._selected = [params for params in self.parameters()
+                                  if self.select(params)]
+        return self._selected
+
+    def make_sample(self, params):
+        """Constructs the sample described by PARAMS."""
+        return self.sample_from(params, omit=self.omit,
+                                treatment=self.treatment)
+
+    @classmethod
+    def sample_from(cls, params, omit=frozenset(), treatment=()):
+        """
+        Constructs the sample described by PARAMS without a plate, e.g. in
+        a worker process that holds only the parameters.
+
+        Keywords
+        --------
+        :omit, set: Fields to leave out of the sample. Default: none.
+        :treatment, sequence: Heat treatment of the alloy, as for the
+            *treatment* of a plate. Default: none.
+        """
+        sample = cls.sample_class(omit=omit)
+        for key, value in params.items():
+            if key not in omit:
+                setattr(sample, key, value)
+        if treatment and not omit.intersection(('alloy', 'treatment')):
+            for method, args, kwds in treatment:
+                getattr(sample.alloy, method)(*args, **kwds)
+        return sample
+#end 'class Plate(object):'
@@ -0,0 +1,277 @@
+"""
+Registry of input sources.
+
+A source is a named reader of plates. It declares
+
+    reader       a Plate subclass, read as a single plate, or a callable that
+                 accepts the arguments of the source and the select and omit
+                 keywords and returns an iterable of plates
+    layout       the Plate subclass of those plates (see
+                 pifify.io.input.plate), which defines their cells and
+                 parameters. Default: the reader, if it is a Plate.
+    sample       the sample class, built on SampleMeta. Default: the
+                 sample_class of the layout. Besides _prep, and _props, it
+                 declares the _domain, (kind, minimum, maximum), of each of
+                 them (see pifify.samples.validate), which validates the
+                 parameters and types their columns in tables.
+    arguments    a callable that converts the arguments of the source, as
+                 strings, to those of the reader, raising a ValueError if
+                 they are malformed. Default: a Plate reader takes none;
+                 another reader takes the strings as they are.
+
+A reader must be deterministic: the command line reads each source once to
+validate its plates and again to export them, so both must see the same
+plates, cells and parameters, e.g. not depend on the order of a directory
+listing.
+
+Anything declared as a 'module:attribute' string is only imported when the
+source is used, so that listing the sources stays cheap. On the command line
+a source is NAME[:ARG[:ARG...]], e.g. faustson-plate5-build2 or
+synthetic:100:10; the arguments are converted, and so checked, before any
+source is read.
+
+The sources that ship with pifify are registered below. Another package adds
+its own by declaring an entry point in the ENTRY_POINTS group that names a
+Source, or a reader, e.g. in its setup.py
+
+    entry_points={'pifify.sources' : [
+        'acme-plate1 = acme.pifify:PLATE1',
+    ]}
+
+Entry points are only loaded when a name is not found among the sources
+registered here.
+"""
+
+from collections import OrderedDict
+from importlib import import_module
+
+
+# entry point group in which other packages register sources
+ENTRY_POINTS = 'pifify.sources'
+
+
+def resolve(obj):
+    """Returns OBJ, or the object it names if it is a 'module:attribute'."""
+    if not isinstance(obj, basestring):
+        return obj
+    modname, _, attr = obj.partition(':')
+    result = import_module(modname)
+    for name in attr.split('.') if attr else ():
+        result = getattr(result, name)
+    return result
+
+
+class Source(object):
+    """
+    A named reader of plates.
+
+    Parameters
+    ----------
+    :name, str: Name of the source, e.g. faustson-plate5-build2.
+    :reader, class, callable or str: Plate subclass, or callable that
+        returns plates, or the 'module:attribute' that names either.
+
+    Keywords
+    --------
+    :layout, class or str: Plate subclass of the plates read. Default: the
+        reader, if it is a Plate.
+    :sample, class or str: Sample class of the plates read. Default: the
+        sample_class of the layout.
+    :arguments, callable or str: Converts the arguments of the source, as
+        strings, to those of the reader. Default: see the module.
+    :usage, str: How the source is given on the command line. Default: NAME
+    :description, str: One-line description. Default: ''
+    """
+    def __init__(self, name, reader, layout=None, sample=None,
+                 arguments=None, usage=None, description=''):
+        self.name = name.lower()
+        self.usage = usage or self.name
+        self.description = description
+        self._reader = reader
+        self._layout = layout
+        self._sample = sample
+        self._arguments = arguments
+        self._checked = False
+
+    def __str__(self):
+        return self.usage
+
+    @property
+    def reader(self):
+        self._reader = resolve(self._reader)
+        return self._reader
+
+    @property
+    def layout(self):
+        from .plate import Plate
+        if self._layout is None:
+            reader = self.reader
+            if isinstance(reader, type) and issubclass(reader, Plate):
+                self._layout = reader
+        self._layout = resolve(self._layout)
+        return self._layout
+
+    @property
+    def sample(self):
+        if self._sample is None and self.layout is not None:
+            self._sample = self.layout.sample_class
+        self._sample = resolve(self._sample)
+        return self._sample
+
+    def check(self):
+        """
+        Imports the reader, layout and sample class of the source and
+        raises a TypeError if they are not what the source declares, e.g.
+        if the sample class lacks the _domain of a parameter.
+        """
+        if self._checked:
+            return
+        from .plate import Plate
+        from ...samples.base import SampleMeta
+        if not callable(self.reader):
+            raise TypeError('{}: the reader is not callable.'.format(
+                self.name))
+        layout = self.layout
+        if not (isinstance(layout, type) and issubclass(layout, Plate)):
+            raise TypeError('{}: the layout, {!r}, is not a Plate ' \
+                            'subclass.'.format(self.name, layout))
+        if getattr(layout, '__abstractmethods__', None):
+            raise TypeError('{}: the layout, {}, does not define {}.'.format(
+                self.name, layout.__name__,
+                ', '.join(sorted(layout.__abstractmethods__))))
+        sample = self.sample
+        if not isinstance(sample, SampleMeta):
+            raise TypeError('{}: the sample class, {!r}, is not built on ' \
+                            'SampleMeta.'.format(self.name, sample))
+        if not issubclass(sample, layout.sample_class or sample):
+            raise TypeError('{}: {} is not the sample class of {}.'.format(
+                self.name, sample.__name__, layout.__name__))
+        from ...samples.validate import Validator
+        try:
+            Validator.compile(sample)
+        except ValueError as exc:
+            raise TypeError('{}: {}'.format(self.name, exc))
+        self._checked = True
+
+    def parse_arguments(self, *args):
+        """
+        Returns the arguments of the reader, as a tuple, from ARGS, those
+        of the source as strings, e.g. ('100', '10'). Raises a ValueError
+        if they are malformed.
+        """
+        from .plate import Plate
+        self.check()
+        if self._arguments is not None:
+            return tuple(resolve(self._arguments)(*args))
+        reader = self.reader
+        if args and isinstance(reader, type) and issubclass(reader, Plate):
+            raise ValueError('{} takes no arguments.'.format(self.name))
+        return args
+
+    def plates(self, *args, **kwds):
+        """
+        Returns the plates of the source.
+
+        Parameters
+        ----------
+        :args: Arguments of the reader, as returned by parse_arguments.
+
+        Keywords
+        --------
+        select, omit: Passed to each plate.
+        """
+        from .plate import Plate
+        self.check()
+        reader = self.reader
+        if isinstance(reader, type) and issubclass(reader, Plate):
+            return [reader(*args, **kwds)]
+        return reader(*args, **kwds)
+#end 'class Source(object):'
+
+
+# registered sources, by name
+_sources = OrderedDict()
+# whether the entry points have been loaded
+_loaded = False
+
+
+def register(source, reader=None, **kwds):
+    """
+    Registers SOURCE, a Source, or the name of one, constructed from
+    READER and KWDS, and returns it. A source already registered under the
+    same name is replaced.
+    """
+    if not isinstance(source, Source):
+        source = Source(source, reader, **kwds)
+    _sources[source.name] = source
+    return source
+
+
+def _load_entry_points():
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    try:
+        import pkg_resources
+    except ImportError:
+        return
+    for entry in pkg_resources.iter_entry_points(ENTRY_POINTS):
+        if entry.name.lower() in _sources:
+            continue
+        obj = entry.load()
+        if not isinstance(obj, Source):
+            obj = Source(entry.name, obj)
+        _sources.setdefault(obj.name, obj)
+
+
+def names(plugins=False):
+    """
+    Returns the names of the registered sources, and, if PLUGINS, of those
+    registered through entry points.
+    """
+    if plugins:
+        _load_entry_points()
+    return list(_sources)
+
+
+def get(name):
+    """
+    Returns the Source registered as NAME (case insensitive). Raises a
+    ValueError if there is none.
+    """
+    name = name.lower()
+    if name not in _sources:
+        _load_entry_points()
+    try:
+        return _sources[name]
+    except KeyError:
+        raise ValueError('{} is not a recognized source.'.format(name))
+
+
+def parse(spec):
+    """
+    Returns the Source and the arguments of SPEC, NAME[:ARG[:ARG...]].
+    """
+    fields = spec.split(':')
+    return get(fields[0]), tuple(fields[1:])
+
+
+# ####################################
+# sources that ship with pifify
+# ####################################
+for _plate, _build, _cls in ((1, 1, 'P001B001'), (2, 1, 'P002B001'),
+                             (3, 1, 'P003B001'), (4, 1, 'P004B001'),
+                             (5, 1, 'P005B001'), (5, 2, 'P005B002'),
+                             (6, 1, 'P006B001')):
+    register('faustson-plate{}-build{}'.format(_plate, _build),
+             'pifify.io.input.Faustson:' + _cls,
+             sample='pifify.samples.Faustson:FaustsonSample',
+             description='Faustson plate {}, build {}'.format(_plate, _build))
+register('synthetic', 'pifify.io.input.synthetic:campaign',
+         layout='pifify.io.input.synthetic:SyntheticPlate',
+         arguments='pifify.io.input.synthetic:parse',
+         sample='pifify.samples.Faustson:FaustsonSample',
+         usage='synthetic:NPLATES:NBUILDS[:SEED]',
+         description='Seeded synthetic campaign, for scaling tests')
+del _plate, _build, _cls
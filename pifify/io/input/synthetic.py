@@ -0,0 +1,157 @@
+"""
+Synthetic campaigns for load and scaling tests.
+
+A campaign is NPLATES x NBUILDS plates that share the CylinderPlate2mmX4mm
+layout and FaustsonSample schema of the Faustson plates. Each build is
+given a random design-of-experiments laser settings table, in the format of
+P005_B002-laser-settings.json, a random powder history and laser, and one
+of a set of heat treatment schedules. Everything is derived from a seed,
+and every plate from its own (seed, plate, build) stream, so a campaign is
+reproducible and any plate may be generated on its own.
+
+Plates are generated as they are consumed, and their samples as the plates
+are iterated over, so memory does not grow with the size of the campaign.
+
+From the command line, a campaign is the source
+
+    synthetic:NPLATES:NBUILDS[:SEED]
+
+e.g. `python -m pifify.pifify --no-pif -t campaign.arrow synthetic:100:10`
+tabulates 100 x 10 x 605 = 605,000 samples.
+"""
+
+import json
+import random
+
+from .Faustson import CylinderPlate2mmX4mm
+
+
+# Levels of each factor in the laser settings design, as in
+# P005_B002-laser-settings.json.
+LEVELS = (('innerSkinLaserPower', ('-15', '15')),
+          ('innerSkinLaserSpeed', ('-15', '15')),
+          ('innerSkinLaserSpot', ('0', '30')),
+          ('skinLaserPower', ('-15', '15')),
+          ('skinLaserSpeed', ('-15', '15')),
+          ('skinLaserSpot', ('0', '30')),
+          ('skinOverlap', ('0.08', '0.16', '0.24')))
+
+# Solution anneal temperatures (K) and aging temperature pairs (K) from
+# which heat treatment schedules are drawn.
+SOLUTION = (1228, 1253, 1283)
+AGING = ((993, 893), (1003, 903), (983, 883))
+
+
+def laser_settings(rng, cells, levels=LEVELS):
+    """
+    Returns a random laser settings table for CELLS, in the format of
+    P005_B002-laser-settings.json: {'M16' : {'skinOverlap' : '0.16', ...}}.
+
+    Parameters
+    ----------
+    :rng, random.Random: Source of random numbers.
+    :cells, iterable: Cell names, e.g. 'M16'.
+
+    Keywords
+    --------
+    :levels, sequence: (factor, levels) pairs. Default: LEVELS
+    """
+    table = {}
+    for cell in cells:
+        table[cell] = dict((factor, rng.choice(values))
+                          for factor, values in levels)
+    return table
+
+
+def heat_treatment(rng):
+    """
+    Returns a random heat treatment schedule, as used for the treatment
+    of a plate: none, a solution anneal, or a solution anneal followed by
+    a two-step age as for P001B001.
+    """
+    kind = rng.randint(0, 2)
+    if kind == 0:
+        return ()
+    solution = rng.choice(SOLUTION)
+    schedule = [
+        ('anneal', (solution,), dict(duration=1,
+                                     description='solution anneal')),
+        ('cool', (solution,), dict(description='oven cool'))]
+    if kind == 2:
+        first, second = rng.choice(AGING)
+        hours = rng.choice((4, 8, 10))
+        schedule.extend([
+            ('anneal', (first,), dict(duration=hours,
+                                      description='aging-1')),
+            ('cool', (first,), dict(duration=2, Tstop=second,
+                                    description='aging-2')),
+            ('anneal', (second,), dict(duration=hours,
+                                       description='aging-3'))])
+    return tuple(schedule)
+
+
+class SyntheticPlate(CylinderPlate2mmX4mm):
+    """
+    A randomly configured build on the CylinderPlate2mmX4mm layout.
+
+    Parameters
+    ----------
+    :plate, int: Plate number.
+    :build, int: Build number.
+
+    Keywords
+    --------
+    :seed, int: Campaign seed. Default: 0
+    All other keywords (select, omit) are passed to CylinderPlate2mmX4mm.
+    """
+    def __init__(self, plate, build, seed=0, **kwds):
+        super(SyntheticPlate, self).__init__(**kwds)
+        rng = random.Random((seed*1000003 + plate)*1009 + build)
+        self.settings = (('plate', plate),
+                         ('build', build),
+                         ('laserIndex', rng.choice((-1, 1, 2))),
+                         ('virgin', rng.choice((100., 50., 20.))),
+                         ('sieveCount', rng.randint(0, 3)))
+        self.treatment = heat_treatment(rng)
+        self.modifications = laser_settings(
+            rng, [self.cell_name(col, row) for col, row in self.cells()])
+#end 'class SyntheticPlate(CylinderPlate2mmX4mm):'
+
+
+def campaign(nplates, nbuilds, seed=0, **kwds):
+    """
+    Generates the NPLATES x NBUILDS plates of a synthetic campaign, plate
+    by plate, build by build.
+
+    Keywords
+    --------
+    :seed, int: Campaign seed. Default: 0
+    All other keywords (select, omit) are passed to each SyntheticPlate.
+    """
+    for plate in xrange(1, nplates+1):
+        for build in xrange(1, nbuilds+1):
+            yield SyntheticPlate(plate, build, seed=seed, **kwds)
+
+
+def write_laser_settings(path, table):
+    """Writes a laser settings TABLE in the P005_B002 JSON format."""
+    with open(path, 'w') as ofs:
+        json.dump(table, ofs)
+
+
+def parse(*args):
+    """
+    Converts the arguments of the synthetic source (see
+    pifify.io.input.registry), NPLATES:NBUILDS[:SEED] as strings from the
+    command line, to those of campaign.
+    """
+    try:
+        if len(args) not in (2, 3):
+            raise ValueError()
+        nplates, nbuilds = int(args[0]), int(args[1])
+        seed = int(args[2]) if len(args) == 3 else 0
+    except ValueError:
+        raise ValueError('synthetic:{} is not of the form ' \
+                         'synthetic:NPLATES:NBUILDS[:SEED].'.format(
+                         ':'.join(args)))
+    return nplates, nbuilds, seed
@@ -0,0 +1,157 @@
+"""
+Content-addressed storage of the parts that records share.
+
+Most of a record is repeated across a campaign: the alloy, with its
+composition, references and heat treatment, and the printing instrument.
+In the deduplicated layout, each record is still written to <urn>.json, with
+the URN of the standard record, but the values of the keys in KEYS are
+replaced by references,
+
+    {"$fragment": "<sha1 of the value>"}
+
+to files fragments/<sha1>.json, each written only once. Fragments may
+themselves reference fragments, e.g. an alloy references its composition,
+so alloys that differ only in heat treatment still share their composition.
+So that a record may hold a key of its own named "$fragment", every key of a
+record that starts with "$" is written with a second "$" in front of it.
+
+expand() and read() re-hydrate deduplicated records into standard PIF.
+"""
+
+import os
+import json
+from collections import OrderedDict
+from hashlib import sha1
+
+# keys whose values are stored as fragments
+KEYS = ('subSystems', 'composition', 'references', 'instrument')
+# name of the directory, within the output directory, that holds fragments
+FRAGMENTS = 'fragments'
+# key of a reference to a fragment
+REFERENCE = '$fragment'
+# first character of the keys that are escaped, by doubling it
+ESCAPE = '$'
+
+
+def _canonical(obj):
+    return json.dumps(obj, sort_keys=True, separators=(',', ':'))
+
+
+class FragmentStore(object):
+    """
+    Writes records in the deduplicated layout.
+
+    Parameters
+    ----------
+    :directory, str: Output directory. Fragments are stored in its
+        FRAGMENTS subdirectory, which is created if need be.
+
+    Keywords
+    --------
+    :keys, sequence: Keys whose values are stored as fragments.
+        Default: KEYS
+    """
+    def __init__(self, directory, keys=KEYS):
+        self.directory = os.path.join(directory, FRAGMENTS)
+        self.keys = frozenset(keys)
+        if not os.path.isdir(self.directory):
+            os.mkdir(self.directory)
+        self._known = set(name[:-len('.json')]
+                          for name in os.listdir(self.directory)
+                          if name.endswith('.json'))
+
+    def __len__(self):
+        return len(self._known)
+
+    def dumps(self, text):
+        """
+        Returns the deduplicated form of the record TEXT, storing any new
+        fragments.
+        """
+        record = json.loads(text, object_pairs_hook=OrderedDict)
+        return json.dumps(self.reduce(record))
+
+    def fragment(self, value):
+        """Stores VALUE, if it is new, and returns a reference to it."""
+        text = _canonical(value)
+        digest = sha1(text.encode('utf-8')).hexdigest()
+        if digest not in self._known:
+            path = os.path.join(self.directory, digest + '.json')
+            with open(path, 'w') as ofs:
+                ofs.write(text)
+            self._known.add(digest)
+        return {REFERENCE : digest}
+
+    def reduce(self, obj):
+        """
+        Returns OBJ with the values of KEYS replaced by references, and its
+        own keys that start with ESCAPE escaped.
+        """
+        if isinstance(obj, list):
+            return [self.reduce(value) for value in obj]
+        if not isinstance(obj, dict):
+            return obj
+        result = OrderedDict()
+        for key, value in obj.items():
+            value = self.reduce(value)
+            if key in self.keys:
+                value = self.fragment(value)
+            if key.startswith(ESCAPE):
+                key = ESCAPE + key
+            result[key] = value
+        return result
+#end 'class FragmentStore(object):'
+
+
+def expand(obj, directory, cache=None):
+    """
+    Returns OBJ, a deduplicated record, or part of one, with every
+    reference replaced by the fragment it names.
+
+    Parameters
+    ----------
+    :obj: Deduplicated record, as parsed from JSON.
+    :directory, str: Directory that holds the records, and so the FRAGMENTS
+        subdirectory.
+
+    Keywords
+    --------
+    :cache, dict: Fragments already read, by digest; pass the same
+        dictionary when expanding many records. Default: None
+    """
+    if cache is None:
+        cache = {}
+    if isinstance(obj, list):
+        return [expand(value, directory, cache) for value in obj]
+    if not isinstance(obj, dict):
+        return obj
+    if len(obj) == 1 and REFERENCE in obj:
+        digest = obj[REFERENCE]
+        try:
+            fragment = cache[digest]
+        except KeyError:
+            path = os.path.join(directory, FRAGMENTS, digest + '.json')
+            with open(path) as ifs:
+                fragment = json.load(ifs)
+            cache[digest] = fragment
+        # the cached fragment is rebuilt, so records never share containers
+        return expand(fragment, directory, cache)
+    return dict((key[1:] if key.startswith(ESCAPE) else key,
+                 expand(value, directory, cache))
+                for key, value in obj.items())
+
+
+def read(directory):
+    """
+    Generates (urn, record) for every record in DIRECTORY, written in the
+    deduplicated layout, re-hydrated into a standard pif object.
+    """
+    from pypif import pif
+    cache = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not name.endswith('.json') or not os.path.isfile(path):
+            continue
+        with open(path) as ifs:
+            record = json.load(ifs)
+        yield name[:-len('.json')], pif.loado(expand(record, directory, cache))
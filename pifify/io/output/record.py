@@ -0,0 +1,59 @@
+"""
+Encoding of samples as PIF records, and the URNs that name them.
+
+The URN of a record is derived from its JSON text, so every writer that
+reports URNs, e.g. the parameter tables, must encode samples through here
+to agree with the exported records. read() loads the records of an export
+back, e.g. to compare two exports (see pifify.io.diff).
+"""
+
+import os
+import json
+from hashlib import md5 as hashfunc
+from uuid import UUID
+
+
+def get_urn(key):
+    """Generate a unique identifier from the key."""
+    urn = UUID(hashfunc(key).hexdigest()).get_urn()
+    urn = urn.split(':')[-1]
+    return urn
+
+
+def encode(sample):
+    """
+    Returns the JSON string of SAMPLE from which its URN is derived. Every
+    writer that reports URNs must go through this to agree with the
+    exported records.
+    """
+    from pypif import pif
+    return pif.dumps(sample, indent=4)
+
+
+def encode_record(sample):
+    """
+    Returns the URN of SAMPLE and the text of its record, which carries
+    the URN as its uid.
+    """
+    from pypif import pif
+    jstr = encode(sample)
+    urn = get_urn(jstr)
+    sample.uid = urn
+    return urn, pif.dumps(sample)
+
+
+def read(directory):
+    """
+    Generates (urn, record) for every record in DIRECTORY, in order of URN,
+    where record is the parsed JSON of the record. Records written in the
+    deduplicated layout (see pifify.io.output.fragments) are re-hydrated.
+    """
+    from .fragments import expand
+    cache = {}
+    for name in sorted(os.listdir(directory)):
+        path = os.path.join(directory, name)
+        if not name.endswith('.json') or not os.path.isfile(path):
+            continue
+        with open(path) as ifs:
+            record = json.load(ifs)
+        yield name[:-len('.json')], expand(record, directory, cache)
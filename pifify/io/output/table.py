@@ -0,0 +1,256 @@
+"""
+Tabular export of sample parameters.
+
+Writes one row per selected sample, straight from the plate parameters, to
+a columnar file: an Arrow IPC file (.arrow), which may be memory mapped
+when read back, or a Parquet file (.parquet). Rows are written in batches,
+so memory use is bounded by the batch size rather than the campaign size.
+
+The columns are those of the sample classes of the plates, typed by their
+_domain (see pifify.samples.validate), plus the urn, source, annealed and
+treatment of each sample; a range parameter, e.g. powderSize, becomes two
+columns, powderSizeMin and powderSizeMax. A row with a parameter that has no
+column raises a ValueError rather than losing it.
+
+The urn column holds the same URN as the exported PIF record of the sample,
+so tables and records may be joined. Computing it requires constructing and
+encoding each sample; pass urn=False to skip that work, or write the rows of
+records that are being written anyway, with their URNs, with write_rows.
+
+Requires pyarrow.
+"""
+
+import os
+from collections import OrderedDict
+from itertools import chain, islice
+import pyarrow as pa
+
+from ..rows import rows
+
+
+# (column, type) of every column in the table of FaustsonSample, in order.
+# Tables of other sample classes keep this order for the columns they share
+# with it, and add their own after them, by name. Parameters not defined for
+# a sample are left null.
+COLUMNS = (
+    ('urn', pa.string()),
+    ('source', pa.string()),
+    ('plate', pa.int64()),
+    ('build', pa.int64()),
+    ('col', pa.string()),
+    ('row', pa.int64()),
+    ('RD', pa.float64()),
+    ('TD', pa.float64()),
+    ('polar', pa.float64()),
+    ('azimuth', pa.float64()),
+    ('laserIndex', pa.int64()),
+    ('innerSkinLaserPower', pa.float64()),
+    ('innerSkinLaserSpeed', pa.float64()),
+    ('innerSkinLaserSpot', pa.float64()),
+    ('innerSkinOverlap', pa.float64()),
+    ('skinLaserPower', pa.float64()),
+    ('skinLaserSpeed', pa.float64()),
+    ('skinLaserSpot', pa.float64()),
+    ('skinOverlap', pa.float64()),
+    ('nlayers', pa.int64()),
+    ('plateMaterial', pa.string()),
+    ('powderSizeMin', pa.float64()),
+    ('powderSizeMax', pa.float64()),
+    ('sieveCount', pa.int64()),
+    ('virgin', pa.float64()),
+    ('annealed', pa.bool_()),
+    ('treatment', pa.string())
+)
+SCHEMA = pa.schema([pa.field(name, dtype) for name, dtype in COLUMNS])
+
+# column type of each kind of parameter in a _domain. A range is held as
+# two float columns.
+TYPES = {'bool' : pa.bool_(), 'int' : pa.int64(), 'real' : pa.float64(),
+         'str' : pa.string()}
+
+FORMATS = ('.arrow', '.parquet')
+
+
+def table_schema(sample_classes):
+    """
+    Returns the schema of a table of samples of SAMPLE_CLASSES, built on
+    SampleMeta, from the _domain of each. Raises a ValueError if two of
+    them give a parameter different kinds.
+    """
+    order = dict((name, i) for i, (name, dtype) in enumerate(COLUMNS))
+    columns = OrderedDict([('urn', pa.string()), ('source', pa.string()),
+                           ('annealed', pa.bool_()),
+                           ('treatment', pa.string())])
+    kinds = {}
+    for cls in sample_classes:
+        for key, (kind, lo, hi) in sorted(cls._domain.items()):
+            if kinds.setdefault(key, (kind, cls))[0] != kind:
+                raise ValueError('{} is {} in {}, but {} in {}.'.format(
+                    key, kinds[key][0], kinds[key][1].__name__, kind,
+                    cls.__name__))
+            if kind == 'range':
+                columns[key + 'Min'] = pa.float64()
+                columns[key + 'Max'] = pa.float64()
+            else:
+                columns[key] = TYPES[kind]
+    names = sorted(columns, key=lambda name: (name not in order,
+                                              order.get(name), name))
+    return pa.schema([pa.field(name, columns[name]) for name in names])
+
+
+def table_format(path):
+    """Returns the table format, one of FORMATS, implied by PATH."""
+    for ext in FORMATS:
+        if path.lower().endswith(ext):
+            return ext
+    raise ValueError('{}: tables must be written to one of: {}.'.format(
+        path, ', '.join(FORMATS)))
+
+
+def batches(rows, batch_size=4096, schema=SCHEMA):
+    """
+    Generates pyarrow.RecordBatches of at most BATCH_SIZE of ROWS. Raises
+    a ValueError for a row with a column that SCHEMA does not have.
+    """
+    stream = iter(rows)
+    names = schema.names
+    known = set(names)
+    # the columns of each row are checked once per distinct set of columns
+    checked = set()
+    while True:
+        # accumulate columns rather than rows: a column of scalars is far
+        # smaller than the equivalent rows
+        data = [[] for name in names]
+        for row in islice(stream, batch_size):
+            keys = tuple(row)
+            if keys not in checked:
+                unknown = [key for key in keys if key not in known]
+                if unknown:
+                    raise ValueError('The table has no column for {} of ' \
+                                     '{}.'.format(', '.join(unknown),
+                                                  row.get('source')))
+                checked.add(keys)
+            for values, name in zip(data, names):
+                values.append(row.get(name))
+        if not data[0]:
+            break
+        arrays = [pa.array(values, type=field.type)
+                  for values, field in zip(data, schema)]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_table(path, plates, batch_size=4096, urn=True, schema=None):
+    """
+    Writes the parameters of the selected samples in PLATES to PATH.
+
+    Parameters
+    ----------
+    :path, str: Output file. The extension selects the format: '.arrow'
+        for an Arrow IPC file or '.parquet' for Parquet.
+    :plates, iterable: Plates whose samples are to be tabulated.
+
+    Keywords
+    --------
+    :batch_size, int: Number of rows held in memory at once. Default: 4096
+    :urn, bool: Fill in the URN of each record. Default: True
+    :schema, pyarrow.Schema: Schema of the table, e.g. from table_schema.
+        Default: that of the sample class of the first plate.
+
+    Return
+    ------
+    The number of rows written.
+    """
+    plates = iter(plates)
+    if schema is None:
+        first = next(plates, None)
+        classes = [first.sample_class] if first is not None else []
+        schema = table_schema(classes)
+        plates = chain([first] if first is not None else [], plates)
+    return write_rows(path, rows(plates, urn=urn), batch_size=batch_size,
+                      schema=schema)
+
+
+def write_rows(path, rows, batch_size=4096, schema=SCHEMA):
+    """
+    Writes ROWS, as from pifify.io.rows.rows, to PATH. If anything fails,
+    e.g. while the rows are generated, the partial file is removed.
+
+    Parameters
+    ----------
+    :path, str: Output file. The extension selects the format: '.arrow'
+        for an Arrow IPC file or '.parquet' for Parquet.
+    :rows, iterable: Rows to write.
+
+    Keywords
+    --------
+    :batch_size, int: Number of rows held in memory at once. Default: 4096
+    :schema, pyarrow.Schema: Schema of the table, e.g. from table_schema.
+        Default: SCHEMA, that of FaustsonSample.
+
+    Return
+    ------
+    The number of rows written.
+    """
+    fmt = table_format(path)
+    count = 0
+    try:
+        if fmt == '.parquet':
+            import pyarrow.parquet as pq
+            writer = pq.ParquetWriter(path, schema)
+            try:
+                for batch in batches(rows, batch_size=batch_size,
+                                     schema=schema):
+                    writer.write_table(pa.Table.from_batches([batch]))
+                    count += batch.num_rows
+            finally:
+                writer.close()
+        else:
+            sink = pa.OSFile(path, 'wb')
+            try:
+                writer = pa.RecordBatchFileWriter(sink, schema)
+                for batch in batches(rows, batch_size=batch_size,
+                                     schema=schema):
+                    writer.write_batch(batch)
+                    count += batch.num_rows
+                writer.close()
+            finally:
+                sink.close()
+    except:
+        if os.path.exists(path):
+            os.remove(path)
+        raise
+    return count
+
+
+def read_table(path, columns=None, memory_map=True):
+    """
+    Reads a table written by write_table.
+
+    Parameters
+    ----------
+    :path, str: Table file.
+
+    Keywords
+    --------
+    :columns, list: Names of the columns to read. Default: all columns.
+    :memory_map, bool: Memory map the file rather than reading it into
+        memory. For Arrow IPC files, the columns of the returned table are
+        then views onto the mapped file. Default: True
+
+    Return
+    ------
+    A pyarrow.Table.
+    """
+    fmt = table_format(path)
+    if fmt == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path, columns=columns, memory_map=memory_map)
+    if memory_map:
+        source = pa.memory_map(path, 'r')
+    else:
+        source = pa.OSFile(path, 'rb')
+    table = pa.ipc.open_file(source).read_all()
+    if columns is not None:
+        table = pa.Table.from_arrays([table.column(name) for name in columns],
+                                     names=list(columns))
+    return table
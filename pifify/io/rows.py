@@ -0,0 +1,150 @@
+"""
+Flat, one-row-per-sample views of plate parameters, shared by the tabular
+and comparison tools.
+
+A row is a dictionary keyed by column: the plate parameters, with each
+range parameter of the sample class (see its _domain) split in two, e.g.
+powderSize into powderSizeMin and powderSizeMax, plus the
+source plate, its heat treatment and, optionally, the URN of the record.
+Rows may also be read back from exported records (see record_rows).
+"""
+
+from collections import OrderedDict
+import numpy as np
+
+from .output.record import encode, get_urn
+
+
+# range parameters of each sample class, by class
+_ranges = {}
+
+
+def _range_keys(sample_class):
+    """The keys of the range parameters of SAMPLE_CLASS, in order."""
+    try:
+        return _ranges[sample_class]
+    except KeyError:
+        keys = sorted(key for key, (kind, lo, hi)
+                      in sample_class._domain.items() if kind == 'range')
+        return _ranges.setdefault(sample_class, keys)
+
+
+def make_row(layout, params, treatment=()):
+    """
+    Returns the row of one sample, without its URN.
+
+    Parameters
+    ----------
+    :layout, class: Plate subclass of the plate of the sample.
+    :params, dict: Parameters of the sample, as from the plate's selected().
+
+    Keywords
+    --------
+    :treatment, sequence: Heat treatment of the plate. Default: none.
+    """
+    row = OrderedDict(params)
+    for key in _range_keys(layout.sample_class):
+        lo, hi = row.pop(key, (None, None))
+        row[key + 'Min'] = lo
+        row[key + 'Max'] = hi
+    row['source'] = layout.__name__
+    row['annealed'] = any(method == 'anneal'
+                          for method, args, kwds in treatment)
+    row['treatment'] = '; '.join(kwds.get('description', method)
+                                 for method, args, kwds in treatment)
+    return row
+
+
+def rows(plates, urn=True):
+    """
+    Generates one row for every selected sample of each plate in PLATES.
+
+    Parameters
+    ----------
+    :plates, iterable: Plates, e.g. pifify.io.input.Faustson.P005B002.
+
+    Keywords
+    --------
+    :urn, bool: If True (default), construct and encode each sample to
+        fill in its URN. Otherwise, rows have no urn.
+    """
+    for plate in plates:
+        for params in plate.selected():
+            row = make_row(type(plate), params, plate.treatment)
+            if urn:
+                row['urn'] = get_urn(encode(plate.make_sample(params)))
+            yield row
+
+
+def record_rows(records, sample_classes):
+    """
+    Generates one row for each exported record, with the columns of *rows*
+    that a record preserves: the plate parameters, the heat treatment and
+    the URN. Which plate produced a record, and whether its treatment
+    included an anneal, are not recorded, so rows have no source or
+    annealed column.
+
+    Parameters
+    ----------
+    :records, iterable: (urn, record) pairs, as from
+        pifify.io.output.record.read.
+    :sample_classes, iterable: Sample classes whose _prep factories named
+        the parameters, e.g. FaustsonSample. Details of the records that
+        none of them names are left out.
+    """
+    names = {}
+    for cls in sample_classes:
+        for key, factory in cls._prep.items():
+            name = getattr(factory, 'name', None)
+            if name is not None:
+                names.setdefault(name, key)
+    for urn, record in records:
+        row = OrderedDict()
+        for step in record.get('preparation') or ():
+            for detail in step.get('details') or ():
+                key = names.get(detail.get('name'))
+                if key is None:
+                    continue
+                value = detail.get('scalars')
+                if isinstance(value, dict):
+                    # a range, e.g. the powder size
+                    row[key + 'Min'] = value.get('minimum')
+                    row[key + 'Max'] = value.get('maximum')
+                else:
+                    row[key] = value
+        row['treatment'] = '; '.join(
+            step.get('name', '')
+            for system in record.get('subSystems') or ()
+            for step in system.get('preparation') or ())
+        row['urn'] = urn
+        yield row
+
+
+def columns(rows):
+    """
+    Collects ROWS into an ordered dictionary of numpy arrays, one per
+    column, in order of first appearance. Columns that some rows lack are
+    object arrays holding None for the missing values.
+    """
+    rows = list(rows)
+    names = OrderedDict()
+    for row in rows:
+        for name in row:
+            names[name] = None
+    result = OrderedDict()
+    for name in names:
+        values = [row.get(name) for row in rows]
+        if any(value is None for value in values):
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+        else:
+            array = np.asarray(values)
+        result[name] = array
+    return result
+
+
+def rows_from(columns):
+    """The inverse of *columns*: generates one row per index."""
+    names = list(columns)
+    for values in zip(*[columns[name] for name in names]):
+        yield OrderedDict(zip(names, values))
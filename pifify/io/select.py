@@ -0,0 +1,144 @@
+"""
+Selection of samples by the parameters that describe them, evaluated before
+any sample is constructed.
+
+A selection is written as one or more whitespace-separated clauses,
+
+    plate=5 build=2 row=3:10 col=C:F RD=100:250 polar=0,90
+
+each of the form KEY=SPEC, where KEY is a sample attribute (e.g. plate,
+build, row, col, RD, TD, polar, azimuth, skinLaserPower, virgin,
+plateMaterial) and SPEC is one of
+
+    VALUE           equal to VALUE
+    V1,V2,...       equal to any one of the listed values
+    LO:HI           between LO and HI, inclusive. Either bound may be
+                    omitted, e.g. RD=:200 or row=20:
+
+A cell is selected only if it satisfies every clause; a cell that does not
+define KEY does not satisfy the clause. Values containing whitespace may be
+quoted, e.g. "plateMaterial='P20 steel'".
+"""
+
+import shlex
+from numbers import Number
+
+
+def _number(text):
+    """Returns TEXT as a float, or None if it is not numeric."""
+    try:
+        return float(text)
+    except ValueError:
+        return None
+
+
+class Clause(object):
+    """A single KEY=SPEC clause of a selection."""
+    # relative tolerance used when testing numeric values for equality
+    rtol = 1e-9
+
+    def __init__(self, text):
+        try:
+            key, spec = text.split('=', 1)
+        except ValueError:
+            raise ValueError('Selection clause "{}" is not of the form ' \
+                             'KEY=SPEC.'.format(text))
+        self.key = key.strip()
+        spec = spec.strip()
+        if not self.key or not spec:
+            raise ValueError('Selection clause "{}" is not of the form ' \
+                             'KEY=SPEC.'.format(text))
+        self.text = text
+        if ':' in spec:
+            lo, hi = [bound.strip() for bound in spec.split(':', 1)]
+            self.values = None
+            self.bounds = tuple((bound, _number(bound)) if bound else None
+                                for bound in (lo, hi))
+        else:
+            self.values = tuple((value.strip(), _number(value.strip()))
+                                for value in spec.split(','))
+            self.bounds = None
+
+    def __call__(self, params):
+        try:
+            value = params[self.key]
+        except KeyError:
+            return False
+        if isinstance(value, (tuple, list)):
+            # ranged parameters, e.g. powder size, match if all their
+            # values match
+            return all(self.match(v) for v in value)
+        return self.match(value)
+
+    def __repr__(self):
+        return 'Clause({!r})'.format(self.text)
+
+    def _pick(self, value, spec):
+        """Returns the text or numeric form of SPEC, whichever suits VALUE."""
+        text, number = spec
+        if isinstance(value, Number):
+            return number
+        return text
+
+    def match(self, value):
+        """True if the scalar VALUE satisfies the clause."""
+        numeric = isinstance(value, Number)
+        if not numeric:
+            value = str(value)
+        if self.values is not None:
+            for spec in self.values:
+                target = self._pick(value, spec)
+                if target is None:
+                    continue
+                if numeric:
+                    if abs(value - target) <= self.rtol*max(1., abs(target)):
+                        return True
+                elif value == target:
+                    return True
+            return False
+        # a non-numeric bound never brackets a number
+        lo, hi = self.bounds
+        if lo is not None:
+            target = self._pick(value, lo)
+            if target is None or value < target:
+                return False
+        if hi is not None:
+            target = self._pick(value, hi)
+            if target is None or value > target:
+                return False
+        return True
+#end 'class Clause(object):'
+
+
+class Selection(object):
+    """
+    Callable that returns True for the parameter dictionaries that satisfy
+    every clause, e.g.
+
+        >>> select = Selection('plate=5 build=2', 'row=3:10 col=C:F')
+        >>> plate = P005B002(select=select)
+    """
+
+    def __init__(self, *texts):
+        self.clauses = []
+        for text in texts:
+            self.clauses.extend(Clause(clause) for clause in shlex.split(text))
+
+    def __call__(self, params):
+        for clause in self.clauses:
+            if not clause(params):
+                return False
+        return True
+
+    def __len__(self):
+        return len(self.clauses)
+
+    def __repr__(self):
+        return 'Selection({})'.format(
+            ', '.join(repr(c.text) for c in self.clauses))
+
+    @property
+    def keys(self):
+        """Keys referenced by the selection."""
+        return set(clause.key for clause in self.clauses)
+#end 'class Selection(object):'
@@ -0,0 +1,298 @@
+"""
+Parallel construction and encoding of records from a shared, memory-mapped
+table of plate parameters.
+
+Rather than pickling samples, or plates, to worker processes, the parameters
+of every selected cell are published once into a flat numpy record array
+backed by a temporary file. Workers map the same file read-only, so the
+parameters reach them without being copied, and each task names only a
+range of rows. Workers send back the encoded records, so inter-process
+traffic is proportional to the output.
+
+    >>> for urn, text in encode_records(plates, jobs=4):
+    ...     pass
+"""
+
+import os
+import json
+import tempfile
+import multiprocessing
+from collections import OrderedDict
+import numpy as np
+
+from .output.record import encode_record
+from .rows import make_row
+
+
+# kind of each parameter, from which its python type is restored
+_KINDS = {bool : 'b', int : 'i', long : 'i', float : 'f'}
+# numpy type that holds each kind exactly. Strings, e.g. the column or the
+# plate material, are held in a list, and the table holds their index.
+_TYPES = {'b' : '?', 'i' : 'i8', 'f' : 'f8', 's' : 'i4'}
+
+
+def _kind(value):
+    if isinstance(value, (tuple, list)):
+        return 't' + ''.join(_kind(v) for v in value)
+    if isinstance(value, basestring):
+        return 's'
+    try:
+        return _KINDS[type(value)]
+    except KeyError:
+        raise TypeError('Cannot share parameter of type {}.'.format(
+            type(value).__name__))
+
+
+def _compatible(kind, other):
+    """
+    True if a parameter of KIND may be held in the field of one of kind
+    OTHER: numbers may share a field, as long as they are held exactly;
+    strings may not, and tuples only element by element.
+    """
+    if kind.startswith('t') or other.startswith('t'):
+        return kind[0] == other[0] and len(kind) == len(other) and \
+            all(_compatible(k, o) for k, o in zip(kind[1:], other[1:]))
+    return kind == other or (kind != 's' and other != 's')
+
+
+def _field(key, kind):
+    """numpy field that holds a parameter of KIND."""
+    if kind.startswith('t'):
+        # one member per element, e.g. (low, high) of the powder size
+        return (key, [('f{}'.format(i), _TYPES[k])
+                      for i, k in enumerate(kind[1:])])
+    return (key, _TYPES[kind])
+
+
+_RESTORE = {'b' : bool, 'i' : int, 'f' : float}
+
+
+def _restore(kind, value, strings):
+    if kind.startswith('t'):
+        return tuple(_restore(k, v, strings)
+                     for k, v in zip(kind[1:], value))
+    if kind == 's':
+        return strings[value]
+    return _RESTORE[kind](value)
+
+
+class ParameterTable(object):
+    """
+    Parameters of the selected cells of many plates, one row per cell, in a
+    memory-mapped numpy record array.
+
+    Besides one field per parameter, each row holds the index of its plate
+    in *plates*, a list of (plate class, omit, treatment), and the index of
+    its layout in *layouts*, a list of ((key, kind), ...) that restores the
+    order and python type of each parameter exactly, so that records built
+    from the table are identical to those built from the plates. Integers
+    are held as 64-bit integers and strings in *strings*, by index; a value
+    the table cannot hold exactly raises a ValueError when it is published.
+
+    Pickling a table, e.g. to send it to a worker, sends only the name of
+    its file and this metadata; the receiving process maps the file itself.
+    """
+
+    def __init__(self, path, dtype, length, layouts, plates, strings):
+        self.path = path
+        self.dtype = dtype
+        self.length = length
+        self.layouts = layouts
+        self.plates = plates
+        self.strings = strings
+        self._array = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_array'] = None
+        return state
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def array(self):
+        """Read-only view of the table."""
+        if self._array is None:
+            self._array = np.memmap(self.path, dtype=self.dtype, mode='r',
+                                    shape=(self.length,))
+        return self._array
+
+    def close(self):
+        """Removes the file that backs the table."""
+        self._array = None
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def params(self, i):
+        """Returns the parameters of row I, as from a plate's selected()."""
+        row = self.array[i]
+        layout = self.layouts[row['_layout']]
+        params = OrderedDict()
+        for key, kind in layout:
+            params[key] = _restore(kind, row[key], self.strings)
+        return row['_plate'], params
+
+    def row(self, i):
+        """Returns the row of the sample in row I (see pifify.io.rows)."""
+        iplate, params = self.params(i)
+        cls, omit, treatment = self.plates[iplate]
+        return make_row(cls, params, treatment)
+
+    def sample(self, i):
+        """Constructs the sample in row I."""
+        iplate, params = self.params(i)
+        cls, omit, treatment = self.plates[iplate]
+        return cls.sample_from(params, omit=omit, treatment=treatment)
+
+    @classmethod
+    def publish(cls, plates, directory=None):
+        """
+        Writes the parameters of the selected cells of PLATES to a new
+        table. Plates are consumed one at a time, and their rows written as
+        they are produced.
+
+        The fields of the table are those of the first cell. A later cell
+        with a parameter that is not among them, or that cannot be held
+        exactly in its field, raises a ValueError.
+
+        Keywords
+        --------
+        :directory, str: Directory for the file that backs the table.
+            Default: the system temporary directory.
+        """
+        fd, path = tempfile.mkstemp(prefix='pifify-', suffix='.params',
+                                    dir=directory)
+        dtype = None
+        fields = None
+        kinds = None
+        layouts = []
+        layout_index = {}
+        metadata = []
+        strings = []
+        string_index = {}
+        def store(kind, value):
+            # the value held in the table for a parameter of KIND
+            if kind.startswith('t'):
+                return tuple(store(k, v) for k, v in zip(kind[1:], value))
+            if kind != 's':
+                return value
+            # str and unicode are kept apart, as they are written apart
+            key = (type(value), value)
+            if key not in string_index:
+                string_index[key] = len(strings)
+                strings.append(value)
+            return string_index[key]
+        length = 0
+        try:
+            with os.fdopen(fd, 'wb') as ofs:
+                for plate in plates:
+                    selected = plate.selected()
+                    if not selected:
+                        continue
+                    metadata.append((type(plate), plate.omit,
+                                     plate.treatment))
+                    if dtype is None:
+                        kinds = dict((key, _kind(value))
+                                     for key, value in selected[0].items())
+                        fields = [_field(key, kinds[key])
+                                  for key, value in selected[0].items()]
+                        dtype = np.dtype(fields + [('_plate', 'i4'),
+                                                   ('_layout', 'i4')])
+                    block = np.zeros(len(selected), dtype=dtype)
+                    for j, params in enumerate(selected):
+                        layout = tuple((key, _kind(value))
+                                       for key, value in params.items())
+                        if layout not in layout_index:
+                            missing = [key for key, kind in layout
+                                       if key not in dtype.names]
+                            if missing:
+                                raise ValueError('Cannot share parameter(s) ' \
+                                    '{} absent from the first ' \
+                                    'cell.'.format(', '.join(missing)))
+                            mismatched = [key for key, kind in layout
+                                          if not _compatible(kind,
+                                                             kinds[key])]
+                            if mismatched:
+                                raise ValueError('Cannot share parameter(s) ' \
+                                    '{} of another kind than in the first ' \
+                                    'cell.'.format(', '.join(mismatched)))
+                            layout_index[layout] = len(layouts)
+                            layouts.append(layout)
+                        for key, kind in layout:
+                            value = params[key]
+                            block[key][j] = store(kind, value)
+                            # e.g. a float in a field that holds the
+                            # integers of the first cell
+                            held = _restore(kind, block[key][j], strings)
+                            if json.dumps(held) != json.dumps(value):
+                                raise ValueError('Cannot share {}={!r} ' \
+                                    'exactly.'.format(key, value))
+                        block['_layout'][j] = layout_index[layout]
+                    block['_plate'] = len(metadata) - 1
+                    block.tofile(ofs)
+                    length += len(selected)
+        except:
+            os.remove(path)
+            raise
+        if dtype is None:
+            dtype = np.dtype([('_plate', 'i4'), ('_layout', 'i4')])
+        return cls(path, dtype, length, layouts, metadata, strings)
+#end 'class ParameterTable(object):'
+
+
+# table of the worker process, set by _initialize
+_table = None
+
+
+def _initialize(table):
+    global _table
+    _table = table
+
+
+def _encode_range(bounds):
+    """Encodes the records in rows [start, stop) of the worker's table."""
+    start, stop = bounds
+    return [encode_record(_table.sample(i)) for i in xrange(start, stop)]
+
+
+def encode_records(plates, jobs=None, chunksize=64, directory=None,
+                   rows=False):
+    """
+    Generates (urn, text), as from pifify.io.output.record.encode_record, for every
+    selected sample of PLATES, in order, using JOBS worker processes.
+
+    Keywords
+    --------
+    :jobs, int: Number of worker processes. Default: one per CPU.
+    :chunksize, int: Number of rows per task. Default: 64
+    :directory, str: Directory for the shared parameter table. Default:
+        the system temporary directory.
+    :rows, bool: Generate (row, urn, text) instead, where row is that of
+        the sample (see pifify.io.rows.make_row), built from the same
+        parameters as its record. Default: False
+    """
+    table = ParameterTable.publish(plates, directory=directory)
+    try:
+        if not len(table):
+            return
+        bounds = [(start, min(start + chunksize, len(table)))
+                  for start in xrange(0, len(table), chunksize)]
+        pool = multiprocessing.Pool(jobs, initializer=_initialize,
+                                    initargs=(table,))
+        try:
+            i = 0
+            for records in pool.imap(_encode_range, bounds):
+                for record in records:
+                    if rows:
+                        record = (table.row(i),) + record
+                    yield record
+                    i += 1
+            pool.close()
+        except:
+            pool.terminate()
+            raise
+        finally:
+            pool.join()
+    finally:
+        table.close()
@@ -0,0 +1,172 @@
+"""
+Concurrent reading of several sources into one stream of plates.
+
+Each source is read in its own thread, which constructs its plates and
+computes the parameters of their selected cells, a few plates ahead of the
+export, into a bounded queue. The stream yields the plates of the first
+source, then of the second, and so on, exactly as reading the sources one
+after the other would, so that exports do not depend on timing; meanwhile
+the later sources are already being read.
+
+Threads share the interpreter, so this overlaps reading, e.g. of settings
+files, with exporting, rather than adding processors; construct and encode
+records in worker processes (pifify.io.shared) for that.
+
+Throughput is counted where the records of the stream are written, which
+may be in other processes and well after their plates were yielded: tally
+passes through one item per sample, in order, and charges each, and the time
+taken to produce and consume it, to the source of its sample.
+
+    >>> stream = Prefetch([('a', read_a), ('b', read_b)])
+    >>> records = (encode_record(sample)
+    ...            for plate in stream for sample in plate)
+    >>> for urn, text in stream.tally(records):
+    ...     write(urn, text)
+    >>> for stats in stream.stats:
+    ...     print stats
+"""
+
+import sys
+import time
+import threading
+from Queue import Queue, Full, Empty
+
+
+class SourceStats(object):
+    """
+    Throughput of one source in a stream.
+
+    *read* is the time spent reading the source, in its thread; *records*
+    the number of its samples written, and *export* the time spent
+    producing and writing them, e.g. constructing, encoding and writing
+    their records, as counted by Prefetch.tally.
+    """
+    def __init__(self, name):
+        self.name = name
+        self.plates = 0
+        self.samples = 0
+        self.read = 0.
+        self.records = 0
+        self.export = 0.
+
+    @property
+    def rate(self):
+        """Records written per second."""
+        return self.records/self.export if self.export else float('nan')
+
+    def __str__(self):
+        return '{}: {} plate(s), {} sample(s), read {:.3f} s, {} record(s) ' \
+               'in {:.3f} s, {:.1f} records/s'.format(
+               self.name, self.plates, self.samples, self.read, self.records,
+               self.export, self.rate)
+#end 'class SourceStats(object):'
+
+
+# marks the end of the plates of a source
+_END = object()
+# how often, in seconds, a blocked reader checks whether to stop
+_POLL = 0.1
+
+
+class Prefetch(object):
+    """
+    Stream of the plates of several sources, each read in its own thread.
+
+    Parameters
+    ----------
+    :sources, sequence: (name, reader) pairs, where reader() returns an
+        iterable of plates.
+
+    Keywords
+    --------
+    :maxsize, int: Number of plates each source may read ahead.
+        Default: 2
+
+    Attributes
+    ----------
+    :stats, list: SourceStats of each source, in order, updated as the
+        stream, and the items passed through tally, are consumed.
+    """
+    def __init__(self, sources, maxsize=2):
+        self.sources = list(sources)
+        self.maxsize = maxsize
+        self.stats = [SourceStats(name) for name, reader in self.sources]
+
+    def _read(self, reader, stats, queue, stop):
+        """Body of the thread that reads one source."""
+        def put(item):
+            while not stop.is_set():
+                try:
+                    queue.put(item, timeout=_POLL)
+                    return True
+                except Full:
+                    pass
+            return False
+        try:
+            start = time.time()
+            for plate in reader():
+                # the parameters of the selected cells are kept by the plate
+                plate.selected()
+                stats.read += time.time() - start
+                if not put(plate):
+                    return
+                start = time.time()
+            stats.read += time.time() - start
+            put(_END)
+        except:
+            put(sys.exc_info())
+
+    def __iter__(self):
+        stop = threading.Event()
+        queues = [Queue(self.maxsize) for source in self.sources]
+        threads = [threading.Thread(target=self._read,
+                                    args=(reader, stats, queue, stop))
+                   for (name, reader), stats, queue
+                   in zip(self.sources, self.stats, queues)]
+        for thread in threads:
+            thread.daemon = True
+            thread.start()
+        try:
+            for stats, queue in zip(self.stats, queues):
+                while True:
+                    item = queue.get()
+                    if item is _END:
+                        break
+                    if isinstance(item, tuple):
+                        raise item[0], item[1], item[2]
+                    stats.plates += 1
+                    stats.samples += len(item.selected())
+                    yield item
+        finally:
+            stop.set()
+            for queue in queues:
+                try:
+                    while True:
+                        queue.get_nowait()
+                except Empty:
+                    pass
+            for thread in threads:
+                thread.join()
+
+    def tally(self, items):
+        """
+        Generates ITEMS, one per sample of the stream, in order, e.g. the
+        (urn, text) of each record, and counts each, with the time taken
+        to produce it and to consume it, against the source of its sample.
+        """
+        sources = iter(self.stats)
+        stats = next(sources, None)
+        count = 0
+        start = time.time()
+        for item in items:
+            # a sample is counted by the stream before it can be produced
+            while stats is not None and count >= stats.samples:
+                stats, count = next(sources, None), 0
+            yield item
+            now = time.time()
+            if stats is not None:
+                stats.records += 1
+                stats.export += now - start
+            count += 1
+            start = now
+#end 'class Prefetch(object):'
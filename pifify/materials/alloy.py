@@ -1,8 +1,3 @@
-import sys, os
-# sys.path.append(os.path.dirname(os.path.realpath(__file__) + \
-#                 os.path.sep + os.path.pardir + \
-#                 os.path.sep + os.path.pardir))
-sys.path.append('/Users/bkappes/src/citrine/pypif')
 from copy import deepcopy
 from pypif import pif
 
@@ -33,9 +28,10 @@ class AlloyBase(pif.Alloy):
         descriptions = [p.name for p in self.preparation]
         if description in descriptions:
             base = description
+            i = 1
             while description in descriptions:
-                i = 1
                 description = '{}-{:02d}'.format(base, i)
+                i += 1
         # set the values
         details = []
         if 'atmosphere' in kwds:
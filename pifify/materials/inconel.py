@@ -1,12 +1,5 @@
-import sys, os
-# sys.path.append(os.path.dirname(os.path.realpath(__file__) + \
-#                 os.path.sep + os.path.pardir + \
-#                 os.path.sep + os.path.pardir))
-# this is specific the location of pypif, since I haven't
-# installed pypif
-sys.path.append('/Users/bkappes/src/citrine/pypif')
 from pypif import pif
-from alloy import AlloyBase
+from .alloy import AlloyBase
 
 class Inconel718(AlloyBase):
     def __init__(self, **kwds):
@@ -6,30 +6,60 @@ DESCRIPTION
 
 EXAMPLES
 
-    TODO: Show some examples of how to use this script.
+    Export every sample from the second build on plate 5:
+
+        python -m pifify.pifify faustson-plate5-build2
+
+    Export only rows 3-10 of columns C-F, without the alloy composition:
+
+        python -m pifify.pifify --select "row=3:10 col=C:F" \\
+            --omit composition faustson-plate5-build2
+
+    See pifify.io.select for the selection syntax.
 """
 
-from __future__ import division
+from __future__ import division, absolute_import
 
 import sys, os
-sys.path.append(os.path.dirname(os.path.realpath(__file__) + \
-                os.path.sep + os.path.pardir))
 import textwrap, traceback, argparse, re
 import time
-import shutil
 import errno
-import tarfile
-import numpy as np
-from hashlib import md5 as hashfunc
-from uuid import UUID
-from pypif import pif
-from pifify.io.input.Faustson import (P001B001,
-                                      P002B001,
-                                      P003B001,
-                                      P004B001,
-                                      P005B001,
-                                      P005B002,
-                                      P006B001)
+
+from pifify.io.output.record import get_urn, encode, encode_record
+# pypif, the input modules, shutil and tarfile are comparatively expensive to
+# import and are only needed once there is something to convert, so they are
+# imported where they are used. Keep it that way: `--help`, `--version` and
+# argument errors should not pay for them.
+
+
+def load_source(source, select=None, omit=()):
+    """
+    Returns a reader for SOURCE: a callable that returns an iterable of its
+    plates, with the sample class of the source as its sample_class. The
+    module that reads SOURCE is imported, and the arguments of SOURCE,
+    SELECT and OMIT are checked, here, so that a mistake raises a
+    ValueError, or a TypeError for a source that is not what it declares,
+    before any source is read.
+
+    Parameters
+    ----------
+    :source, str: A registered source, NAME[:ARG[:ARG...]] (case
+        insensitive), e.g. faustson-plate5-build2 or synthetic:100:10.
+        See pifify.io.input.registry.
+
+    Keywords
+    --------
+    :select, callable: Selection applied to the samples. Default: all.
+    :omit, iterable: Fields to leave out of the samples.
+    """
+    from pifify.io.input.registry import parse
+    source, arguments = parse(source)
+    arguments = source.parse_arguments(*arguments)
+    source.layout.check_keywords(select=select, omit=omit)
+    def reader():
+        return source.plates(*arguments, select=select, omit=omit)
+    reader.sample_class = source.sample
+    return reader
 
 
 def make_directory(name, retry=0):
@@ -41,7 +71,7 @@ def make_directory(name, retry=0):
     if retry > 0:
         counter = 0
         # zero pad the counter according to the max number of retries
-        fmt = '{}-{:0%d}' % (int(np.log10(retry)) + 1)
+        fmt = '{}-{:0%d}' % len(str(retry))
     directory = name
     while True:
         try:
@@ -65,70 +95,150 @@ def make_directory(name, retry=0):
                 raise exc
 
 
-def get_urn(key):
-    """Generate a unique identifier from the key."""
-    urn = UUID(hashfunc(key).hexdigest()).get_urn()
-    urn = urn.split(':')[-1]
-    return urn
+def load_columns(source, select=None, omit=()):
+    """
+    Returns the parameters of the samples in SOURCE as column arrays (see
+    pifify.io.rows.columns). SOURCE is either a recognized source, a table
+    written with --table, or a directory of records written by pifify.
+
+    Keywords
+    --------
+    :select, callable: Selection applied to the samples. Default: all.
+    :omit, iterable: Fields to leave out of the samples of a source.
+    """
+    from pifify.io.rows import columns, rows, rows_from, record_rows
+    if os.path.isdir(source):
+        from pifify.io.input import registry
+        from pifify.io.output.record import read
+        # parameters are recognized by the names the sample classes of
+        # every registered source give them
+        classes = set(registry.get(name).sample
+                      for name in registry.names(plugins=True))
+        records = record_rows(read(source), classes)
+    elif source.lower().endswith(('.arrow', '.parquet')):
+        from pifify.io.output.table import read_table
+        table = read_table(source).to_pydict()
+        records = rows_from(table)
+    else:
+        plates = load_source(source, select=select, omit=omit)()
+        return columns(rows(plates, urn=False))
+    if select is not None:
+        records = (row for row in records if select(row))
+    return columns(records)
 
 
-def filename_from(key, directory='.', overwrite=False):
+def compare(sources, select=None, omit=()):
     """
-    Makes a filename based on the hash of KEY.
+    Compares the parameters of the samples in two SOURCES, cell by cell,
+    and writes the differences to stdout as a table.
+    """
+    from pifify.io.diff import diff
+    if len(sources) != 2:
+        raise ValueError('--diff compares exactly two sources.')
+    a, b = [load_columns(source, select=select, omit=omit)
+            for source in sources]
+    sys.stdout.write(diff(a, b, labels=sources).table() + '\n')
 
-    Parameters
-    ----------
-    :key, str: String object on which to construct a UUID-based filename.
 
-    Keywords
-    --------
-    :directory, str: Directory in which to place the newly created file.
-        Default: '.'
-    :overwrite, bool: If True, then the existing file will be overwritten.
-        If False (default), then an error is raised.
-
-    Return
-    ------
-    The filename as a string.
+def report(stream):
     """
-    # validate input
-    directory=directory.rstrip('/')
-    # hash the key to create a URN
-    urn = get_urn(key)
-    # store this in the newly created directory
-    ofile = '{}/{}.json'.format(directory, urn)
-    try:
-        _ = open(ofile)
-        if not overwrite:
-            raise ValueError()
-    except IOError:
-        pass
-    except ValueError:
-        raise IOError()
-    return ofile
+    With --verbose, writes the throughput of each source in STREAM, counted
+    as its records were written.
+    """
+    if args.verbose > 0:
+        for stats in stream.stats:
+            print stats
 
 
 def main ():
     global args
-    samples = []
+    import shutil
+    select = None
+    if args.select:
+        from pifify.io.select import Selection
+        try:
+            select = Selection(*args.select)
+        except ValueError as exc:
+            sys.stderr.write('ERROR: {}\n'.format(exc))
+            sys.exit(1)
+    omit = [field.strip()
+            for fields in args.omit for field in fields.split(',')]
+    if args.diff:
+        try:
+            compare(args.sources, select=select, omit=omit)
+        except ValueError as exc:
+            sys.stderr.write('ERROR: {}\n'.format(exc))
+            sys.exit(1)
+        return
     # ####################################
     # read
     # ####################################
-    for source in args.sources:
+    # resolve and check every source before constructing any of them, so
+    # that a typo in the last source does not cost the construction of the
+    # first.
+    from pifify.io.stream import Prefetch
+    try:
+        readers = [(source, load_source(source, select=select, omit=omit))
+                   for source in args.sources]
+        if args.table:
+            # the columns of the table are those of the sample classes of
+            # every source
+            from pifify.io.output.table import table_schema
+            classes = []
+            for source, reader in readers:
+                if reader.sample_class not in classes:
+                    classes.append(reader.sample_class)
+            schema = table_schema(classes)
+    except (ValueError, TypeError) as exc:
+        sys.stderr.write('ERROR: {}\n'.format(exc))
+        sys.exit(1)
+    def plates():
+        # plates, and the samples on them, are generated as they are
+        # written, so that memory does not grow with the number of samples.
+        # Each source is read in its own thread, a few plates ahead.
+        return Prefetch(readers, maxsize=args.prefetch)
+    if args.validate:
+        # check everything before anything is written. This reads the
+        # sources once more, so their readers must be deterministic (see
+        # pifify.io.input.registry).
+        from pifify.samples.validate import validate, ValidationError
         try:
-            subset = {
-                'faustson-plate1-build1' : P001B001().samples,
-                'faustson-plate2-build1' : P002B001().samples,
-                'faustson-plate3-build1' : P003B001().samples,
-                'faustson-plate4-build1' : P004B001().samples,
-                'faustson-plate5-build1' : P005B001().samples,
-                'faustson-plate5-build2' : P005B002().samples,
-                'faustson-plate6-build1' : P006B001().samples
-            }[source.lower()]
-        except KeyError:
-            raise ValueError('{source:} is not a recognized source.'.format(
-                source=source))
-        samples.extend(subset)
+            validate(plates())
+        except ValidationError as exc:
+            sys.stderr.write('ERROR: {}\n'.format(exc))
+            sys.exit(1)
+    if not (args.create_records or args.table):
+        return
+    # ####################################
+    # encode
+    # ####################################
+    # every sample is constructed and encoded once, here. The row of each
+    # sample in the table is taken from the parameters its record was built
+    # from, so that every row holds the URN of its own record.
+    from pifify.io.rows import make_row
+    stream = plates()
+    if args.jobs > 1:
+        from pifify.io.shared import encode_records
+        records = encode_records(stream, jobs=args.jobs, rows=True)
+        if not args.table:
+            records = ((None, urn, text) for row, urn, text in records)
+    else:
+        def encoded():
+            # generates (row, urn, text) for every sample of the stream
+            for plate in stream:
+                for params in plate.selected():
+                    sample = plate.make_sample(params)
+                    if args.create_records:
+                        urn, text = encode_record(sample)
+                    else:
+                        # only the table is written: encode each sample
+                        # for its URN alone
+                        urn, text = get_urn(encode(sample)), None
+                    row = None
+                    if args.table:
+                        row = make_row(type(plate), params, plate.treatment)
+                    yield row, urn, text
+        records = encoded()
     # ####################################
     # write
     # ####################################
@@ -136,43 +246,65 @@ def main ():
     # should be uploaded separately, i.e. as a separate file. So rather than
     # storing these in a single file, create a directory to store each sample
     # as a separate file in that directory, then tar and zip the directory.
-    directory = args.output
-    directory = make_directory(directory, retry=0)
-    for sample in samples:
-        # generate JSON string
-        jstr = pif.dumps(sample, indent=4)
-        # create a filename from the contents of the record
-        try:
-            ofile = filename_from(jstr, directory=directory)
-        except IOError:
-            msg = 'Sample {} is duplicated.'.format(ofile)
-            if not args.duplicate_error:
-                sys.stdout.write('WARNING: {}' \
-                                 'Skipping.\n'.format(msg))
+    if args.create_records:
+        directory = args.output
+        directory = make_directory(directory, retry=0)
+        store = None
+        if args.dedup:
+            from pifify.io.output.fragments import FragmentStore
+            store = FragmentStore(directory)
+    def written():
+        # generates the row of each record, with its URN, once the record
+        # has been written
+        for row, urn, text in records:
+            if row is not None:
+                row['urn'] = urn
+            if not args.create_records:
+                yield row
                 continue
-            else:
-                msg = 'ERROR: {} To skip duplicates, invoke the ' \
-                      '--duplicate-warning flag.'.format(msg)
-                shutil.rmtree(directory)
-                raise IOError(msg)
-        # Add the UID to the record
-        urn = get_urn(jstr)
-        sample.uid = urn
-        # write the file
-        with open(ofile, 'w') as ofs:
-            pif.dump(sample, ofs)
+            # the filename is the URN, a hash of the contents of the record
+            ofile = '{}/{}.json'.format(directory.rstrip('/'), urn)
+            if os.path.exists(ofile):
+                msg = 'Sample {} is duplicated.'.format(ofile)
+                if not args.duplicate_error:
+                    sys.stdout.write('WARNING: {}' \
+                                     'Skipping.\n'.format(msg))
+                    # the sample remains in the table
+                    yield row
+                    continue
+                else:
+                    msg = 'ERROR: {} To skip duplicates, invoke the ' \
+                          '--duplicate-warning flag.'.format(msg)
+                    shutil.rmtree(directory)
+                    raise IOError(msg)
+            # write the file
+            if store is not None:
+                text = store.dumps(text)
+            with open(ofile, 'w') as ofs:
+                ofs.write(text)
+            yield row
+    if args.table:
+        # a failure removes the partial table
+        from pifify.io.output.table import write_rows
+        write_rows(args.table, stream.tally(written()), schema=schema)
+    else:
+        for row in stream.tally(written()):
+            pass
     # tarball and gzip the new directory
-    if args.create_archive:
+    if args.create_records and args.create_archive:
+        import tarfile
         tarball = '{}.tgz'.format(directory)
         with tarfile.open(tarball, 'w:gz') as tar:
             tar.add(directory)
         shutil.rmtree(directory)
+    report(stream)
 #end 'def main ():'
 
 
 if __name__ == '__main__':
     try:
         start_time = time.time()
+        from pifify.io.input import registry
         parser = argparse.ArgumentParser(
                 #prog='HELLOWORLD', # default: sys.argv[0], uncomment to customize
                 description=textwrap.dedent(globals()['__doc__']),
@@ -195,12 +327,27 @@ if __name__ == '__main__':
             type=str,
             nargs='*', # if there are no other positional parameters
             #nargs=argparse.REMAINDER, # if there are
-            help='List of what should be processed. Recognized keywords: ' \
-                 'faustson-plate1-build1, faustson-plate2-build1, ' \
-                 'faustson-plate3-build1, faustson-plate4-build1, ' \
-                 'faustson-plate5-build1, faustson-plate5-build2, ' \
-                 'faustson-plate6-build1.')
+            help='List of what should be processed. Recognized sources: ' \
+                 '{}, and any registered by other packages (see ' \
+                 'pifify.io.input.registry).'.format(
+                 ', '.join(str(registry.get(name))
+                           for name in registry.names())))
         # optional parameters
+        parser.add_argument('--diff',
+            action='store_true',
+            default=False,
+            help='Instead of exporting, compare the parameters of two ' \
+                 'sources cell by cell and print the fields that differ. ' \
+                 'Either source may also be a table written with --table ' \
+                 'or a directory of records; cells of two exports whose ' \
+                 'URNs agree are reported as identical records.')
+        parser.add_argument('--dedup',
+            action='store_true',
+            default=False,
+            help='Store the parts that records share, e.g. the alloy and ' \
+                 'instrument, once, in a fragments subdirectory, and ' \
+                 'refer to them from each record. Records keep their ' \
+                 'URNs; see pifify.io.output.fragments to read them back.')
         parser.add_argument('--duplicate-error',
             dest='duplicate_error',
             action='store_true',
@@ -214,11 +361,60 @@ if __name__ == '__main__':
             '--output',
             default='samples',
             help='Specify the output directory to hold the resulting files.')
+        parser.add_argument('-j',
+            '--jobs',
+            type=int,
+            default=1,
+            help='Number of worker processes that construct and encode ' \
+                 'records. Default: 1, i.e. no workers.')
+        parser.add_argument('--no-pif',
+            dest='create_records',
+            action='store_false',
+            default=True,
+            help='Do not write PIF records, e.g. when only a --table is ' \
+                 'wanted.')
+        parser.add_argument('--omit',
+            action='append',
+            default=[],
+            metavar='FIELDS',
+            help='Comma-separated list of fields to leave out of each ' \
+                 'record: an attribute, e.g. nlayers, or one of the blocks ' \
+                 'alloy, composition, references, instrument or treatment. ' \
+                 'May be given more than once.')
+        parser.add_argument('--prefetch',
+            type=int,
+            default=2,
+            metavar='N',
+            help='Number of plates each source is read ahead of the ' \
+                 'export, in its own thread. Default: 2')
+        parser.add_argument('-s',
+            '--select',
+            action='append',
+            default=[],
+            metavar='CLAUSES',
+            help='Only export samples that satisfy every KEY=SPEC clause, ' \
+                 'e.g. "row=3:10 col=C:F polar=45". SPEC is a value, a ' \
+                 'comma-separated list of values, or an inclusive LO:HI ' \
+                 'range. May be given more than once.')
+        parser.add_argument('-t',
+            '--table',
+            default=None,
+            metavar='FILE',
+            help='Also write the parameters of every exported sample, one ' \
+                 'row per sample, to FILE: an Arrow IPC (.arrow) or ' \
+                 'Parquet (.parquet) file. Requires pyarrow.')
         parser.add_argument('-v',
             '--verbose',
             action='count',
             default=0,
-            help='Verbose output')
+            help='Verbose output, including the throughput of each ' \
+                 'source.')
+        parser.add_argument('--no-validate',
+            dest='validate',
+            action='store_false',
+            default=True,
+            help='Skip checking the parameters of every sample before ' \
+                 'anything is written.')
         parser.add_argument('--version',
             action='version',
             version='%(prog)s 0.1')
@@ -232,6 +428,15 @@ if __name__ == '__main__':
         # check for correct number of positional parameters
         if len(args.sources) < 1:
             parser.error('missing argument')
+        if args.diff and len(args.sources) != 2:
+            parser.error('--diff compares exactly two sources.')
+        if args.table:
+            # before anything is read, or the output directory is made
+            from pifify.io.output.table import table_format
+            try:
+                table_format(args.table)
+            except ValueError as exc:
+                parser.error(str(exc))
         # timing
         if args.verbose > 0: print time.asctime()
         main()
@@ -1,14 +1,6 @@
-import sys, os
-sys.path.append(os.path.dirname(os.path.realpath(__file__) + \
-                os.path.sep + os.path.pardir))
-# this is specific the location of pypif, since I haven't
-# installed pypif
-try:
-    from pypif import pif
-except ImportError:
-    sys.path.append('/Users/bkappes/src/citrine/pypif')
-    from pypif import pif
-from .base import SampleMeta, preparation_factory, property_factory
+from pypif import pif
+from .base import SampleMeta, preparation_factory, property_factory, \
+    range_factory
 from ..materials.inconel import Inconel718
 
 class FaustsonSample(pif.System):
@@ -40,11 +32,8 @@ class FaustsonSample(pif.System):
             preparation_factory('number of layers'),
         'polar' : \
             preparation_factory('polar angle', units='${}^\circ$'),
-        'powderSize' : lambda lohi : \
-            pif.Property(name = 'powder size',
-                         scalars = pif.Scalar(minimum=lohi[0],
-                                              maximum=lohi[1]),
-                         units='$\mu$m'),
+        'powderSize' : \
+            range_factory('powder size', units='$\mu$m'),
         'plate' : \
             preparation_factory('plate number'),
         'plateMaterial' : \
@@ -71,18 +60,74 @@ class FaustsonSample(pif.System):
             preparation_factory('transverse direction', units='mm')
     }
 
+    # Domain of each entry in _prep, as (kind, minimum, maximum), where kind
+    # is one of 'bool', 'int', 'real', 'str' or 'range' (a (low, high) pair
+    # of reals). A bound of None is open. Laser powers and speeds are
+    # percent changes from nominal. Used to validate parameters before any
+    # sample is constructed (see pifify.samples.validate).
+    _domain = {
+        'annealed' : ('bool', None, None),
+        'build' : ('int', 1, None),
+        'col' : ('str', None, None),
+        'laserIndex' : ('int', -1, None),
+        'innerSkinLaserPower' : ('real', -100., 100.),
+        'innerSkinLaserSpeed' : ('real', -100., 100.),
+        'innerSkinLaserSpot' : ('real', 0., None),
+        'innerSkinOverlap' : ('real', 0., None),
+        'nlayers' : ('int', 1, None),
+        'polar' : ('real', 0., 180.),
+        'powderSize' : ('range', 0., None),
+        'plate' : ('int', 1, None),
+        'plateMaterial' : ('str', None, None),
+        'row' : ('int', 1, None),
+        'sieveCount' : ('int', 0, None),
+        'skinLaserPower' : ('real', -100., 100.),
+        'skinLaserSpeed' : ('real', -100., 100.),
+        'skinLaserSpot' : ('real', 0., None),
+        'skinOverlap' : ('real', 0., None),
+        'azimuth' : ('real', 0., 360.),
+        'virgin' : ('real', 0., 100.),
+        'RD' : ('real', 0., None),
+        'TD' : ('real', 0., None)
+    }
+
+    # Blocks of the record that may be left out of a sample (see *omit*).
+    # 'treatment' is the heat treatment of the alloy, which is added by the
+    # plate rather than the sample.
+    blocks = ('alloy', 'composition', 'references', 'instrument',
+              'treatment')
+
     def __init__(self, *args, **kwds):
+        """
+        Keywords
+        --------
+        :omit, iterable: Blocks (see *blocks*) to leave out of the record.
+            Default: none.
+
+        All other arguments and keywords are passed to pif.System.
+        """
+        omit = kwds.pop('omit', ())
         super(FaustsonSample, self).__init__(*args, **kwds)
-        self.sub_systems = [Inconel718()]
-        self.preparation = [pif.ProcessStep(
-            name='printing',
-            details=[],
-            instrument=[pif.Instrument(
+        if 'alloy' not in omit:
+            alloy = Inconel718()
+            if 'composition' in omit:
+                alloy.composition = None
+            if 'references' in omit:
+                alloy.references = None
+            self.sub_systems = [alloy]
+        if 'instrument' in omit:
+            instrument = None
+        else:
+            instrument = [pif.Instrument(
                 name='Faustson M2',
                 model='M2 Cusing',
                 producer='ConceptLaser',
                 url='http://www.conceptlaserinc.com/machines/'
             )]
+        self.preparation = [pif.ProcessStep(
+            name='printing',
+            details=[],
+            instrument=instrument
         )]
         #self.properties = [
         #    pif.Property(..., category='materials'),
@@ -1,2 +1,2 @@
-from base import property_factory, preparation_factory
-from Faustson import FaustsonSample
+from .base import property_factory, preparation_factory, range_factory
+from .Faustson import FaustsonSample
@@ -1,9 +1,6 @@
-import sys, os
-sys.path.append(os.path.dirname(os.path.realpath(__file__) + \
-                os.path.sep + os.path.pardir))
-# this is specific the location of pypif, since I haven't
-# installed pypif
-sys.path.append('/Users/bkappes/src/citrine/pypif')
+import math
+import threading
+from collections import OrderedDict
 from pypif import pif
 
 
@@ -86,12 +83,150 @@ class SampleMeta(type):
 #end 'class SampleMeta(type):'
 
 
-def value_factory(name, **kwds):
+def _copy(obj):
+    """Copies OBJ, a dictionary form of a pif object, container by container."""
+    if isinstance(obj, dict):
+        return dict((key, _copy(value)) for key, value in obj.items())
+    if isinstance(obj, list):
+        return [_copy(value) for value in obj]
+    return obj
+
+
+class Frozen(object):
+    """
+    Mixin for pif objects that are shared between many records: once
+    constructed, the object cannot be modified, and its dictionary form
+    (see pypif's Serializable.as_dictionary) is computed only once. Each
+    call returns a fresh copy of it, so that a record built from it, and
+    modified, leaves the other records that share the object unchanged.
+
+    Use it ahead of the pif class, e.g.
+
+        class SharedValue(Frozen, pif.Value): pass
+    """
+    def __init__(self, *args, **kwds):
+        super(Frozen, self).__init__(*args, **kwds)
+        dictionary = super(Frozen, self).as_dictionary()
+        object.__setattr__(self, '_dictionary', dictionary)
+
+    def __setattr__(self, key, value):
+        if '_dictionary' in self.__dict__:
+            raise AttributeError('{} is shared and cannot be ' \
+                                 'modified.'.format(type(self).__name__))
+        super(Frozen, self).__setattr__(key, value)
+
+    def __delattr__(self, key):
+        if '_dictionary' in self.__dict__:
+            raise AttributeError('{} is shared and cannot be ' \
+                                 'modified.'.format(type(self).__name__))
+        super(Frozen, self).__delattr__(key)
+
+    def as_dictionary(self):
+        return _copy(self._dictionary)
+#end 'class Frozen(object):'
+
+
+class SharedValue(Frozen, pif.Value):
+    """Immutable pif.Value, as returned by value_factory."""
+    pass
+
+
+class SharedProperty(Frozen, pif.Property):
+    """Immutable pif.Property, as returned by property_factory."""
+    pass
+
+
+class ValueCache(object):
+    """
+    Bounded, thread-safe cache that interns the values created by the value
+    and property factories, so that a setting repeated across thousands of
+    samples, e.g. plateMaterial='P20 steel', is a single shared object.
+    The least recently used entries are evicted beyond MAXSIZE.
+    """
+    def __init__(self, maxsize=4096):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get(self, key, create):
+        """
+        Returns the value stored under KEY, calling CREATE() to construct
+        and store it if there is none. Unhashable keys are not cached.
+        """
+        try:
+            hash(key)
+        except TypeError:
+            return create()
+        with self._lock:
+            try:
+                value = self._data.pop(key)
+            except KeyError:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data[key] = value
+                return value
+        value = create()
+        with self._lock:
+            # another thread may have stored the same key in the meantime;
+            # keep theirs so that the value remains unique.
+            value = self._data.setdefault(key, value)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return value
+#end 'class ValueCache(object):'
+# cache shared by all factories, unless they are given their own
+shared_values = ValueCache()
+
+
+def _typed(x):
+    """
+    Cache key for the scalar(s) X. Types are part of the key because values
+    that compare equal, e.g. 1 and 1.0, are written differently to JSON, and
+    so is the sign of a float, e.g. of 0.0 and -0.0.
+    """
+    if isinstance(x, (tuple, list)):
+        return (type(x), tuple(_typed(v) for v in x))
+    if isinstance(x, float):
+        return (type(x), x, math.copysign(1., x))
+    return (type(x), x)
+
+
+def _factory(cls, name, cache, kwds):
+    """Returns a function that maps X to a (possibly shared) CLS object."""
+    kwds = dict(kwds, name=name)
+    if cache is None:
+        def func(x):
+            return cls(scalars=x, **kwds)
+    else:
+        signature = (cls, tuple(sorted(kwds.items())))
+        def func(x):
+            return cache.get(signature + (_typed(x),),
+                             lambda: cls(scalars=x, **kwds))
+    # describe the values this function creates, e.g. for validation
+    func.name = name
+    func.units = kwds.get('units')
+    return func
+
+
+def value_factory(name, cache=shared_values, **kwds):
     """
     Value factory
 
     Returns a function that accepts one or more scalar values and returns
-    a named pif.Value object.
+    a named pif.Value object. Values are interned: equal arguments return
+    the same immutable SharedValue.
 
     Arguments
     ---------
@@ -99,24 +234,48 @@ def value_factory(name, **kwds):
 
     Keywords
     --------
-    All keywords are passed into pif.Value.
+    :cache, ValueCache: Cache in which values are interned, or None to
+        construct a new, mutable pif.Value on every call.
+        Default: shared_values
+    All other keywords are passed into pif.Value.
     """
-    kwds['name'] = name
-    def func(x):
-        kwds['scalars'] = x
-        return pif.Value(**kwds)
-    return func
+    return _factory(pif.Value if cache is None else SharedValue,
+                    name, cache, kwds)
 # preparation_factory is nothing more than a value_factory whose return
 # value is meant to be stored in a ProcessStep object
 preparation_factory = value_factory
 
 
-def property_factory(name, **kwds):
+def property_factory(name, cache=shared_values, **kwds):
     """
     Property factory
 
     Returns a function that accepts one or more scalar values and returns
-    a named pif.Property object.
+    a named pif.Property object. Properties are interned as in
+    value_factory.
+
+    Arguments
+    ---------
+    :name, str: Name of the property
+
+    Keywords
+    --------
+    :cache, ValueCache: Cache in which properties are interned, or None to
+        construct a new, mutable pif.Property on every call.
+        Default: shared_values
+    All other keywords are passed into pif.Property.
+    """
+    return _factory(pif.Property if cache is None else SharedProperty,
+                    name, cache, kwds)
+
+
+def range_factory(name, **kwds):
+    """
+    Range factory
+
+    Returns a function that accepts a (minimum, maximum) pair and returns a
+    named pif.Property whose scalar spans that range. Ranges are not
+    interned.
 
     Arguments
     ---------
@@ -126,8 +285,11 @@ def property_factory(name, **kwds):
     --------
     All keywords are passed into pif.Property.
     """
-    kwds['name'] = name
-    def func(x):
-        kwds['scalars'] = x
-        return pif.Property(**kwds)
+    def func(lohi):
+        return pif.Property(name=name,
+                            scalars=pif.Scalar(minimum=lohi[0],
+                                               maximum=lohi[1]),
+                            **kwds)
+    func.name = name
+    func.units = kwds.get('units')
     return func
@@ -0,0 +1,184 @@
+"""
+Validation of sample parameters before any sample is constructed.
+
+A Validator is compiled once per sample class from its _prep and _props
+definitions and their _domain, and checks the type and range of every
+parameter of a whole plate at once. validate() collects the problems of
+every plate and raises them together, so that a long export fails before it
+starts rather than part way through.
+
+    >>> validate([P005B002(), P006B001()])
+"""
+
+from numbers import Integral, Real
+import numpy as np
+
+
+class ValidationError(ValueError):
+    """Raised with every problem found; see *problems*."""
+    def __init__(self, problems):
+        self.problems = list(problems)
+        super(ValidationError, self).__init__(
+            '{} problem(s) found:\n  {}'.format(
+                len(self.problems), '\n  '.join(self.problems)))
+
+
+# largest number of offending cells listed in a single problem
+MAX_CELLS = 5
+
+
+def describe(cells):
+    """Lists CELLS, abbreviated beyond MAX_CELLS."""
+    cells = list(cells)
+    text = ', '.join(cells[:MAX_CELLS])
+    if len(cells) > MAX_CELLS:
+        text += ', ... ({} cells)'.format(len(cells))
+    return text
+
+
+def _is_bool(value):
+    return isinstance(value, (bool, np.bool_))
+
+
+def _is_int(value):
+    return isinstance(value, (Integral, np.integer)) and not _is_bool(value)
+
+
+def _is_real(value):
+    return isinstance(value, (Real, np.number)) and not _is_bool(value)
+
+
+def _is_str(value):
+    return isinstance(value, basestring)
+
+
+def _is_range(value):
+    return isinstance(value, (tuple, list)) and len(value) == 2 and \
+        all(_is_real(v) for v in value)
+
+
+_TYPES = {'bool' : _is_bool, 'int' : _is_int, 'real' : _is_real,
+          'str' : _is_str, 'range' : _is_range}
+
+
+class Check(object):
+    """Compiled check of one parameter."""
+
+    def __init__(self, key, kind, lo, hi, units=None):
+        try:
+            self.istype = _TYPES[kind]
+        except KeyError:
+            raise ValueError('{}: unrecognized kind "{}".'.format(key, kind))
+        self.key = key
+        self.kind = kind
+        self.lo = lo
+        self.hi = hi
+        self.units = units
+
+    def __call__(self, values, cells):
+        """
+        Returns a list of problems with VALUES, a list with one entry per
+        cell, labelled by CELLS (an array of cell names).
+        """
+        n = len(values)
+        problems = []
+        istype = self.istype
+        ok = np.fromiter((istype(v) for v in values), dtype=bool, count=n)
+        if not ok.all():
+            problems.append('{}: expected {}, in {}'.format(
+                self.key, self.kind, describe(cells[~ok])))
+        if not ok.any() or (self.lo is None and self.hi is None and
+                            self.kind not in ('real', 'range')):
+            return problems
+        good = [v for v, k in zip(values, ok) if k]
+        where = cells[ok]
+        if self.kind in ('real', 'int', 'range'):
+            array = np.asarray(good, dtype=float)
+            bad = ~np.isfinite(array)
+        else:
+            array = np.asarray(good)
+            bad = np.zeros(array.shape, dtype=bool)
+        if self.lo is not None:
+            bad |= array < self.lo
+        if self.hi is not None:
+            bad |= array > self.hi
+        if self.kind == 'range':
+            bad = bad.any(axis=1) | (array[:, 0] > array[:, 1])
+        if bad.any():
+            problems.append('{}: outside {}[{}, {}]{}, in {}'.format(
+                self.key,
+                'ordered ' if self.kind == 'range' else '',
+                '-inf' if self.lo is None else self.lo,
+                'inf' if self.hi is None else self.hi,
+                '' if not self.units else ' ' + self.units,
+                describe(where[bad])))
+        return problems
+#end 'class Check(object):'
+
+
+class Validator(object):
+    """
+    Checks of every parameter of a sample class, compiled from its _prep
+    and _props definitions and its _domain. Use *compile* rather than
+    constructing one directly, so that each class is compiled only once.
+    """
+    _compiled = {}
+
+    def __init__(self, cls):
+        domain = getattr(cls, '_domain', {})
+        self.checks = {}
+        for definitions in (cls._prep, cls._props):
+            for key, factory in definitions.items():
+                if key not in domain:
+                    raise ValueError('{}.{} has no _domain entry.'.format(
+                        cls.__name__, key))
+                kind, lo, hi = domain[key]
+                self.checks[key] = Check(key, kind, lo, hi,
+                                         getattr(factory, 'units', None))
+
+    @classmethod
+    def compile(cls, sample_class):
+        """Returns the Validator of SAMPLE_CLASS, compiling it if need be."""
+        try:
+            return cls._compiled[sample_class]
+        except KeyError:
+            validator = cls(sample_class)
+            cls._compiled[sample_class] = validator
+            return validator
+
+    def __call__(self, parameters, cells):
+        """
+        Returns a list of problems with PARAMETERS, a list of parameter
+        dictionaries, one per cell, labelled by CELLS.
+        """
+        cells = np.asarray(cells)
+        columns = {}
+        for params in parameters:
+            for key in params:
+                columns.setdefault(key, None)
+        problems = []
+        for key in sorted(columns):
+            present = np.fromiter((key in params for params in parameters),
+                                  dtype=bool, count=len(parameters))
+            if key not in self.checks:
+                problems.append('{}: not a recognized parameter, in ' \
+                                '{}'.format(key, describe(cells[present])))
+                continue
+            values = [params[key] for params in parameters if key in params]
+            problems.extend(self.checks[key](values, cells[present]))
+        return problems
+#end 'class Validator(object):'
+
+
+def validate(plates):
+    """
+    Checks every plate in PLATES, and the parameters of every cell on them,
+    and raises a ValidationError listing every problem found. Plates must
+    provide problems(), as every Plate does.
+    """
+    problems = []
+    for plate in plates:
+        problems.extend('{}: {}'.format(plate, problem)
+                        for problem in plate.problems())
+    if problems:
+        raise ValidationError(problems)
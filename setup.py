@@ -11,6 +11,7 @@ config = {
 	'author_email': 'bkappes@mines.edu',
 	'version': '0.1',
 	'install_requires': ['nose'],
+	'extras_require': {'table': ['pyarrow']},
 	'packages': ['pifify'],
 	'scripts': ['bin/pifify'],
 	'name': 'pifify',
@@ -0,0 +1,135 @@
+"""
+A third-party package of plates, as another package would provide them: a
+sample class and a layout of its own, built on SampleMeta and
+pifify.io.input.plate.Plate, and the sources that read them, registered by
+test_plugin through the pifify.sources entry points of a distribution made
+on the fly.
+"""
+
+from collections import OrderedDict
+
+from pypif import pif
+
+from pifify.io.input.plate import Plate
+from pifify.io.input.registry import Source
+from pifify.samples import FaustsonSample
+from pifify.samples.base import SampleMeta, preparation_factory, \
+	range_factory
+
+
+class GridSample(pif.System):
+	"""A sample with parameters of its own, e.g. the hatch spacing."""
+	__metaclass__ = SampleMeta
+
+	_prep = {
+		'plate' : preparation_factory('plate number'),
+		'build' : preparation_factory('build'),
+		'col' : preparation_factory('column'),
+		'row' : preparation_factory('row'),
+		'hatch' : preparation_factory('hatch spacing', units='mm'),
+		'layerThickness' : range_factory('layer thickness', units='$\mu$m'),
+		'plateMaterial' : preparation_factory('plate material'),
+		'skinLaserPower' : preparation_factory('skin laser power', units='%')
+	}
+	_domain = {
+		'plate' : ('int', 1, None),
+		'build' : ('int', 1, None),
+		'col' : ('str', None, None),
+		'row' : ('int', 1, None),
+		'hatch' : ('real', 0., None),
+		'layerThickness' : ('range', 0., None),
+		'plateMaterial' : ('str', None, None),
+		'skinLaserPower' : ('real', -100., 100.)
+	}
+	blocks = ()
+
+	def __init__(self, *args, **kwds):
+		kwds.pop('omit', ())
+		super(GridSample, self).__init__(*args, **kwds)
+		self.preparation = [pif.ProcessStep(
+			name='printing',
+			details=[],
+			instrument=[pif.Instrument(name='ACME grid printer')])]
+
+	@property
+	def printing(self):
+		return self.preparation[0]
+
+
+class Undeclared(GridSample):
+	"""A sample class that forgets the _domain of one of its parameters."""
+	_prep = dict(GridSample._prep,
+	             speed=preparation_factory('scan speed', units='mm/s'))
+
+
+class GridPlate(Plate):
+	"""NCOLS x 3 cells, A01 to C03 by default, with a single laser setting."""
+	sample_class = GridSample
+	ncols = 3
+	power = 10.
+
+	def __init__(self, ncols=None, **kwds):
+		super(GridPlate, self).__init__(**kwds)
+		if ncols is not None:
+			self.ncols = ncols
+
+	def cells(self):
+		for col in xrange(ord('A'), ord('A') + self.ncols):
+			for row in xrange(1, 3+1):
+				yield col, row
+
+	def cell_name(self, col, row):
+		return '{:s}{:02d}'.format(chr(col), row)
+
+	def cell_parameters(self, col, row):
+		params = OrderedDict()
+		params['col'] = chr(col)
+		params['row'] = row
+		params['hatch'] = 0.1*row
+		params['layerThickness'] = (30, 40)
+		params['plateMaterial'] = 'P20 steel'
+		params['skinLaserPower'] = self.power
+		return params
+
+
+class GridA(GridPlate):
+	settings = (('plate', 1),
+	            ('build', 1))
+
+
+class GridB(GridPlate):
+	settings = (('plate', 1),
+	            ('build', 2))
+	power = 15.
+
+
+class UndeclaredPlate(GridA):
+	sample_class = Undeclared
+
+
+class Incomplete(Plate):
+	"""A layout that forgets to name its cells."""
+	sample_class = FaustsonSample
+
+	def cells(self):
+		return [(ord('A'), 1)]
+
+	def cell_parameters(self, col, row):
+		return OrderedDict([('col', chr(col)), ('row', row)])
+
+
+def ncols(*args):
+	"""Arguments of acme-grid:NCOLS."""
+	try:
+		value, = args
+		return (int(value),)
+	except ValueError:
+		raise ValueError('acme-grid:{} is not of the form ' \
+		                 'acme-grid:NCOLS.'.format(':'.join(args)))
+
+
+GRID_A = Source('acme-grid-a', GridA, description='ACME grid, build 1')
+GRID_B = Source('acme-grid-b', 'acme:GridB', description='ACME grid, build 2')
+GRID = Source('acme-grid', GridB, arguments=ncols, usage='acme-grid:NCOLS')
+INCOMPLETE = Source('acme-incomplete', Incomplete)
+UNDECLARED = Source('acme-undeclared', UndeclaredPlate)
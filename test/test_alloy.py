@@ -0,0 +1,16 @@
+from pifify.materials.inconel import Inconel718
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+
+class TestAlloy:
+	def test_repeated_descriptions(self):
+		alloy = Inconel718()
+		for i in range(3):
+			alloy.anneal(993, 8, description='aging')
+		alloy.cool(993)
+		alloy.cool(993)
+		assert [step.name for step in alloy.preparation] == \
+			['aging', 'aging-01', 'aging-02', 'cool', 'cool-01']
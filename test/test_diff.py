@@ -0,0 +1,167 @@
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+from collections import OrderedDict
+
+import numpy as np
+from nose.tools import assert_raises
+
+from pifify.io.diff import diff
+from pifify.io.input.Faustson import P005B001, P005B002
+from pifify.io.output.fragments import FragmentStore
+from pifify.io.output.record import encode_record, read
+from pifify.io.rows import columns, rows, record_rows
+from pifify.io.select import Selection
+from pifify.samples import FaustsonSample
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+LASER = ['innerSkinLaserPower', 'innerSkinLaserSpeed', 'innerSkinLaserSpot',
+         'skinLaserPower', 'skinLaserSpeed', 'skinLaserSpot', 'skinOverlap']
+
+
+def table(**kwds):
+	"""Column arrays of two cells, A01 and B01, with KWDS as extra columns."""
+	result = OrderedDict([('col', np.array(['A', 'B'])),
+	                      ('row', np.array([1, 1]))])
+	for name, values in kwds.items():
+		array = np.empty(len(values), dtype=object)
+		array[:] = values
+		result[name] = array
+	return result
+
+
+def export(plate, directory, store=None):
+	"""Writes the records of PLATE to DIRECTORY, as the command line does."""
+	for sample in plate:
+		urn, text = encode_record(sample)
+		if store is not None:
+			text = store.dumps(text)
+		with open(os.path.join(directory, urn + '.json'), 'w') as ofs:
+			ofs.write(text)
+
+
+class TestValues:
+	def test_nan(self):
+		nan = float('nan')
+		result = diff(table(x=[nan, 1.]), table(x=[nan, 1.]))
+		assert len(result) == 0, result.changes
+		# object columns, e.g. with missing values
+		result = diff(table(x=[nan, None]), table(x=[nan, None]))
+		assert len(result) == 0, result.changes
+		result = diff(table(x=[nan, None]), table(x=[1., None]))
+		assert [change[:2] for change in result] == [('A01', 'x')]
+
+	def test_mixed(self):
+		result = diff(table(x=[1, 'a'], y=[None, 2]),
+		              table(x=[1.0, 'b'], y=[0, 2.]))
+		assert [change[:2] for change in result] == \
+			[('A01', 'y'), ('B01', 'x')], result.changes
+		assert result.counts() == {'x' : 1, 'y' : 1}
+		assert result.cells == ['A01', 'B01']
+
+	def test_tolerance(self):
+		result = diff(table(x=[1., 2.]), table(x=[1. + 1e-12, 2.1]))
+		assert [change[:2] for change in result] == [('B01', 'x')]
+
+	def test_cells(self):
+		b = table(x=[1., 2.])
+		b['col'] = np.array(['A', 'C'])
+		result = diff(table(x=[1., 2.]), b)
+		assert result.matched == 1
+		assert result.only_a == ['B01'] and result.only_b == ['C01']
+
+	def test_errors(self):
+		a = table(x=[1., 2.])
+		a['col'] = np.array(['A', 'A'])
+		assert_raises(ValueError, diff, a, table(x=[1., 2.]))
+		assert_raises(ValueError, diff, table(x=[1., 2.]),
+		              table(x=[1., 2.]), fields=['y'])
+
+
+class TestSources:
+	def test_builds(self):
+		a = columns(rows([P005B001()], urn=False))
+		b = columns(rows([P005B002()], urn=False))
+		result = diff(a, b, labels=('P005B001', 'P005B002'))
+		assert result.matched == 605
+		assert not result.only_a and not result.only_b
+		assert result.identical is None
+		changed = set(result.counts())
+		assert set(LASER) <= changed, changed
+		assert 'RD' not in changed and 'polar' not in changed
+		assert 'P005B001' in result.table().splitlines()[0]
+
+
+class TestCommandLine:
+	def pifify(self, *args):
+		"""Runs pifify with ARGS; returns (returncode, stdout, stderr)."""
+		env = dict(os.environ, PYTHONPATH=ROOT)
+		proc = subprocess.Popen((sys.executable, '-m', 'pifify.pifify') + args,
+		                        cwd=ROOT, env=env, stdout=subprocess.PIPE,
+		                        stderr=subprocess.PIPE)
+		out, err = proc.communicate()
+		return proc.returncode, out, err
+
+	def test_two_sources(self):
+		for sources in (('faustson-plate1-build1',),
+		                ('faustson-plate1-build1', 'faustson-plate2-build1',
+		                 'faustson-plate3-build1')):
+			rc, out, err = self.pifify('--diff', *sources)
+			assert rc == 2 and 'exactly two sources' in err, err
+
+	def test_unknown_source(self):
+		rc, out, err = self.pifify('--diff', 'faustson-plate1-build1',
+		                           'nonesuch')
+		assert rc == 1 and err.startswith('ERROR: '), err
+		assert 'Traceback' not in out + err
+
+
+class TestExports:
+	def setup(self):
+		self.directory = tempfile.mkdtemp()
+
+	def teardown(self):
+		shutil.rmtree(self.directory)
+
+	def path(self, name):
+		path = os.path.join(self.directory, name)
+		os.mkdir(path)
+		return path
+
+	def test_records(self):
+		select = Selection('row=3:4 col=E:H')
+		path = self.path('b1')
+		export(P005B001(select=select), path)
+		records = columns(record_rows(read(path), [FaustsonSample]))
+		assert len(records['urn']) == 8
+		# records preserve every parameter of the source ...
+		source = columns(rows([P005B001(select=select)]))
+		result = diff(records, source)
+		assert result.matched == 8 and len(result) == 0, result.table()
+		assert 'powderSizeMin' in result.fields
+		assert 'annealed' not in result.fields
+		# ... and their URNs
+		assert result.identical == 8
+
+	def test_exports(self):
+		select = Selection('row=3:4 col=E:H')
+		b1, b2 = self.path('b1'), self.path('b2')
+		export(P005B001(select=select), b1)
+		# the deduplicated layout reads back the same
+		export(P005B002(select=select), b2,
+		       store=FragmentStore(b2))
+		a = columns(record_rows(read(b1), [FaustsonSample]))
+		b = columns(record_rows(read(b2), [FaustsonSample]))
+		result = diff(a, b)
+		assert result.matched == 8
+		assert result.identical == 0
+		expected = diff(columns(rows([P005B001(select=select)])),
+		                columns(rows([P005B002(select=select)])))
+		assert result.changes == expected.changes
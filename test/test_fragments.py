@@ -0,0 +1,73 @@
+import json
+import os
+import shutil
+import tempfile
+
+from pypif import pif
+
+from pifify.io.input.Faustson import P001B001, P005B002
+from pifify.io.output import fragments
+from pifify.io.output.fragments import FragmentStore, FRAGMENTS, REFERENCE
+from pifify.io.output.record import encode_record
+from pifify.io.select import Selection
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+
+class TestFragments:
+	def setup(self):
+		self.directory = tempfile.mkdtemp()
+
+	def teardown(self):
+		shutil.rmtree(self.directory)
+
+	def export(self, plates):
+		"""
+		Writes the records of PLATES in the deduplicated layout, as the
+		command line does, and returns the standard records by URN.
+		"""
+		store = FragmentStore(self.directory)
+		standard = {}
+		for plate in plates:
+			for sample in plate:
+				urn, text = encode_record(sample)
+				standard[urn] = text
+				with open(os.path.join(self.directory, urn + '.json'),
+				          'w') as ofs:
+					ofs.write(store.dumps(text))
+		return standard
+
+	def test_round_trip(self):
+		# every record of a build, and records of a heat treated build
+		# without references
+		standard = self.export([
+			P005B002(),
+			P001B001(select=Selection('row=3:4'), omit=['references'])])
+		assert len(standard) == 605 + 46, len(standard)
+		found = dict(fragments.read(self.directory))
+		assert sorted(found) == sorted(standard)
+		for urn, obj in found.items():
+			assert json.loads(pif.dumps(obj)) == json.loads(standard[urn]), \
+				urn
+		# the shared parts are written once
+		stored = os.listdir(os.path.join(self.directory, FRAGMENTS))
+		assert len(stored) < 20, len(stored)
+
+	def test_reference_key(self):
+		# keys of the record itself that look like references, or escapes
+		record = {'uid' : 'x',
+		          'tags' : [{REFERENCE : 'not a reference'}],
+		          'subSystems' : [{'names' : ['a'],
+		                           '$$escaped' : {REFERENCE : 'y', 'z' : 1}}],
+		          '$other' : 2}
+		store = FragmentStore(self.directory)
+		reduced = json.loads(store.dumps(json.dumps(record)))
+		assert reduced['subSystems'].keys() == [REFERENCE]
+		assert '$$other' in reduced
+		assert fragments.expand(reduced, self.directory) == record
+		# fragments are escaped alike, so a fragment that holds such keys is
+		# re-hydrated exactly
+		reduced = json.loads(store.dumps(json.dumps(record)))
+		assert fragments.expand(reduced, self.directory) == record
@@ -0,0 +1,197 @@
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+
+from nose.tools import assert_raises
+
+from pifify.io.input import registry
+from pifify.io.output.fragments import REFERENCE
+from pifify.io.output.record import read
+from pifify.io.output.table import read_table, table_schema, write_table
+from pifify.pifify import load_source
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# the distribution that declares the sources of acme.py
+PKG_INFO = """Metadata-Version: 1.0
+Name: acme-pifify
+Version: 1.0
+"""
+ENTRY_POINTS = """[pifify.sources]
+acme-grid-a = acme:GRID_A
+acme-grid-b = acme:GRID_B
+acme-grid = acme:GRID
+acme-incomplete = acme:INCOMPLETE
+acme-undeclared = acme:UNDECLARED
+"""
+
+
+class TestPlugin:
+	def setup(self):
+		self.directory = tempfile.mkdtemp()
+		info = os.path.join(self.directory, 'acme_pifify-1.0.egg-info')
+		os.mkdir(info)
+		for name, text in (('PKG-INFO', PKG_INFO),
+		                   ('entry_points.txt', ENTRY_POINTS)):
+			with open(os.path.join(info, name), 'w') as ofs:
+				ofs.write(text)
+
+	def teardown(self):
+		shutil.rmtree(self.directory)
+
+	def path(self, name):
+		return os.path.join(self.directory, name)
+
+	def pifify(self, *args, **kwds):
+		"""
+		Runs pifify with ARGS, where the acme distribution is installed;
+		returns (returncode, stdout, stderr).
+		"""
+		path = os.pathsep.join((ROOT, HERE, self.directory))
+		env = dict(os.environ, PYTHONPATH=path)
+		proc = subprocess.Popen(
+			(sys.executable, '-m', 'pifify.pifify') + args,
+			cwd=self.directory, env=env,
+			stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+		out, err = proc.communicate()
+		if kwds.get('check', True):
+			assert proc.returncode == 0, err
+		return proc.returncode, out, err
+
+	def records(self, name):
+		return dict(read(self.path(name)))
+
+	def test_help(self):
+		rc, out, err = self.pifify('--help')
+		assert 'acme-grid-a' not in out
+		rc, out, err = self.pifify('acme-nonesuch', check=False)
+		assert rc == 1 and 'not a recognized source' in err, err
+
+	def test_table(self):
+		self.pifify('-o', 'a', '-t', 'a.arrow', 'acme-grid-a', 'acme-grid:2')
+		table = read_table(self.path('a.arrow')).to_pydict()
+		assert len(table['urn']) == 9 + 6
+		assert table['col'][:4] == ['A', 'A', 'A', 'B']
+		assert set(table['skinLaserPower']) == set([10., 15.])
+		# the parameters of the sample class of the plugin have columns
+		assert table['hatch'][:3] == [0.1, 0.2, 0.1*3]
+		assert set(table['layerThicknessMin']) == set([30.])
+		assert set(table['layerThicknessMax']) == set([40.])
+		assert 'powderSizeMin' not in table and 'nlayers' not in table
+		assert sorted(table['urn']) == sorted(self.records('a'))
+
+	def test_mixed_table(self):
+		# each source fills in the columns of its own sample class
+		self.pifify('--no-pif', '-s', 'row=3', '-t', 'a.parquet',
+		            'acme-grid-a', 'faustson-plate1-build1')
+		table = read_table(self.path('a.parquet')).to_pydict()
+		assert table['source'] == ['GridA']*3 + ['P001B001']*21
+		assert table['hatch'] == [0.1*3]*3 + [None]*21
+		assert table['nlayers'] == [None]*3 + [195]*21
+
+	def test_diff(self):
+		self.pifify('-o', 'a', 'acme-grid-a')
+		self.pifify('-o', 'b', 'acme-grid-b')
+		for sources in (('acme-grid-a', 'acme-grid-b'), ('a', 'b')):
+			rc, out, err = self.pifify('--diff', *sources)
+			lines = out.splitlines()
+			assert '9 of 9 matched cells differ' in out, out
+			assert [line.split()[:2] for line in lines
+			        if 'skinLaserPower' in line.split()[:2]], out
+
+	def test_jobs(self):
+		self.pifify('-o', 'serial', 'acme-grid-a', 'acme-grid-b')
+		self.pifify('-j', '2', '-o', 'jobs', 'acme-grid-a', 'acme-grid-b')
+		serial, jobs = self.records('serial'), self.records('jobs')
+		assert len(serial) == 18
+		assert serial == jobs
+
+	def test_dedup(self):
+		self.pifify('-o', 'plain', 'acme-grid-a')
+		self.pifify('--dedup', '-o', 'dedup', 'acme-grid-a')
+		referenced = [name for name in os.listdir(self.path('dedup'))
+		              if name.endswith('.json') and REFERENCE in open(
+		                  os.path.join(self.path('dedup'), name)).read()]
+		assert referenced
+		assert self.records('plain') == self.records('dedup')
+
+	def test_checked_before_read(self):
+		# a malformed argument, or an incomplete layout, fails before any
+		# source is read or any record written
+		for source in ('acme-grid:x', 'acme-incomplete', 'acme-undeclared'):
+			rc, out, err = self.pifify('-v', '-o', 'out', 'acme-grid-a',
+			                           source, check=False)
+			assert rc == 1, err
+			assert not os.path.exists(self.path('out'))
+			assert 'record(s)' not in out
+		rc, out, err = self.pifify('-o', 'out', 'acme-grid:x', check=False)
+		assert 'acme-grid:NCOLS' in err, err
+		rc, out, err = self.pifify('-o', 'out', 'acme-incomplete',
+		                           check=False)
+		assert err.startswith('ERROR: ') and 'does not define cell_name' in err
+		rc, out, err = self.pifify('-o', 'out', 'acme-undeclared',
+		                           check=False)
+		assert err.startswith('ERROR: ') and \
+			'Undeclared.speed has no _domain entry' in err, err
+
+
+class TestLayout:
+	def setup(self):
+		sys.path.insert(0, HERE)
+		import acme
+		self.acme = acme
+
+	def teardown(self):
+		sys.path.remove(HERE)
+		for name in ('acme-grid-a', 'acme-incomplete', 'acme-undeclared'):
+			registry._sources.pop(name, None)
+
+	def test_abstract(self):
+		assert_raises(TypeError, self.acme.Incomplete)
+		registry.register(self.acme.INCOMPLETE)
+		assert_raises(TypeError, load_source, 'acme-incomplete')
+
+	def test_undeclared(self):
+		registry.register(self.acme.UNDECLARED)
+		assert_raises(TypeError, load_source, 'acme-undeclared')
+
+	def test_registered(self):
+		registry.register(self.acme.GRID_A)
+		reader = load_source('acme-grid-a')
+		assert reader.sample_class is self.acme.GridSample
+		plates = list(reader())
+		assert [len(plate.selected()) for plate in plates] == [9]
+		assert_raises(ValueError, load_source, 'acme-grid-a', omit=['bogus'])
+		assert_raises(ValueError, load_source, 'synthetic:1')
+
+	def test_schema(self):
+		schema = table_schema([self.acme.GridSample])
+		assert schema.names[:2] == ['urn', 'source']
+		assert 'hatch' in schema.names and 'powderSizeMin' not in schema.names
+		class Conflicting(self.acme.GridSample):
+			_domain = dict(self.acme.GridSample._domain,
+			               hatch=('str', None, None))
+		assert_raises(ValueError, table_schema,
+		              [self.acme.GridSample, Conflicting])
+
+	def test_unknown_column(self):
+		# a parameter without a column is an error, not a lost column
+		from pifify.io.output.table import SCHEMA, write_rows
+		from pifify.io.rows import rows
+		path = os.path.join(tempfile.mkdtemp(), 'grid.arrow')
+		try:
+			plates = [self.acme.GridA()]
+			assert_raises(ValueError, write_rows, path, rows(plates),
+			              schema=SCHEMA)
+			assert not os.path.exists(path)
+			assert write_table(path, [self.acme.GridA()]) == 9
+			assert read_table(path).to_pydict()['hatch'][0] == 0.1
+		finally:
+			shutil.rmtree(os.path.dirname(path))
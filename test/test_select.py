@@ -0,0 +1,156 @@
+import json
+import os
+import sys
+import subprocess
+from collections import OrderedDict
+
+from nose.tools import assert_raises
+
+from pifify.io.select import Clause, Selection
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cell(**kwds):
+	params = OrderedDict([('col', 'M'), ('row', 16), ('RD', 150.),
+	                      ('polar', 45.), ('powderSize', (10, 45)),
+	                      ('plateMaterial', 'P20 steel')])
+	params.update(kwds)
+	return params
+
+
+class TestClause:
+	def test_value(self):
+		assert Clause('row=16')(cell())
+		assert not Clause('row=15')(cell())
+		assert Clause('col=M')(cell())
+		assert not Clause('col=N')(cell())
+
+	def test_list(self):
+		assert Clause('polar=0,45,90')(cell())
+		assert not Clause('polar=0,90')(cell())
+		assert Clause('col=A,M')(cell())
+		assert not Clause('col=A,B')(cell())
+
+	def test_closed_range(self):
+		assert Clause('row=3:16')(cell())
+		assert Clause('row=16:20')(cell())
+		assert not Clause('row=17:20')(cell())
+
+	def test_open_range(self):
+		assert Clause('RD=:200')(cell())
+		assert not Clause('RD=:100')(cell())
+		assert Clause('row=16:')(cell())
+		assert not Clause('row=20:')(cell())
+
+	def test_string_range(self):
+		assert Clause('col=C:M')(cell())
+		assert not Clause('col=C:F')(cell())
+		assert Clause('col=C:F')(cell(col='F'))
+		# a non-numeric bound never brackets a number
+		assert not Clause('row=A:Z')(cell())
+
+	def test_numeric_tolerance(self):
+		assert Clause('polar=45')(cell(polar=45. + 1e-12))
+		assert Clause('polar=45.0')(cell(polar=45))
+		assert not Clause('polar=45')(cell(polar=45.001))
+
+	def test_tuple(self):
+		# ranged parameters match if all of their values match
+		assert Clause('powderSize=10:45')(cell())
+		assert not Clause('powderSize=10:40')(cell())
+		assert not Clause('powderSize=10')(cell())
+		assert Clause('powderSize=10,45')(cell())
+
+	def test_missing_key(self):
+		assert not Clause('build=2')(cell())
+
+	def test_malformed(self):
+		for text in ('row', '=3', 'row=', ' = '):
+			assert_raises(ValueError, Clause, text)
+
+
+class TestSelection:
+	def test_every_clause(self):
+		select = Selection('row=3:20 col=C:M', 'polar=45')
+		assert len(select) == 3
+		assert select.keys == set(['row', 'col', 'polar'])
+		assert select(cell())
+		assert not select(cell(polar=90.))
+
+	def test_quoted(self):
+		assert Selection("plateMaterial='P20 steel'")(cell())
+		assert Selection('"plateMaterial=P20 steel" row=16')(cell())
+		assert not Selection("plateMaterial='P20'")(cell())
+
+	def test_malformed(self):
+		assert_raises(ValueError, Selection, 'row=3 col')
+
+	def test_unknown_key(self):
+		from pifify.io.input.Faustson import P005B001
+		assert_raises(ValueError, P005B001, select=Selection('bogus=1'))
+		assert_raises(ValueError, P005B001, omit=['bogus'])
+
+	def test_plate(self):
+		from pifify.io.input.Faustson import P005B001
+		plate = P005B001(select=Selection('row=3:4 col=C:F'))
+		cells = [(params['col'], params['row'])
+		         for params in plate.selected()]
+		# C03 and D03 are not on the plate
+		assert cells == [('C', 4), ('D', 4), ('E', 3), ('E', 4),
+		                 ('F', 3), ('F', 4)], cells
+		assert len(list(plate)) == len(cells)
+
+	def test_command_line(self):
+		# a malformed selection is reported, not raised
+		env = dict(os.environ, PYTHONPATH=ROOT)
+		proc = subprocess.Popen(
+			(sys.executable, '-m', 'pifify.pifify', '--no-pif', '-s', 'row',
+			 'faustson-plate1-build1'), cwd=ROOT, env=env,
+			stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+		out, err = proc.communicate()
+		assert proc.returncode == 1
+		assert err.startswith('ERROR: ') and 'Traceback' not in err, err
+
+
+class TestP005B002:
+	"""
+	Each cell of P005B002 carries its own laser settings, from
+	P005_B002-laser-settings.json. They were once all given those of Y23.
+	"""
+	def setup(self):
+		from pifify.io.input import Faustson
+		path = os.path.join(os.path.dirname(Faustson.__file__),
+		                    'P005_B002-laser-settings.json')
+		with open(path) as ifs:
+			self.settings = json.load(ifs)
+		self.plate = Faustson.P005B002()
+
+	def test_per_cell_settings(self):
+		parameters = self.plate.parameters()
+		assert len(parameters) == len(self.settings) == 605
+		for params in parameters:
+			name = '{}{:02d}'.format(params['col'], params['row'])
+			for key, value in self.settings[name].items():
+				assert params[key] == float(value), (name, key)
+		distinct = set(tuple(sorted(self.settings[name].items()))
+		               for name in self.settings)
+		assert len(distinct) > 1
+
+	def test_urns(self):
+		from pifify.io.input.Faustson import P005B002
+		from pifify.io.output.record import encode, get_urn
+		# URNs of the published records, which depend on the settings of
+		# their own cell
+		expected = {'G24' : '4c3087af-8729-3bab-14b9-c4feeee46718',
+		            'M16' : 'dfc8f4ef-06ef-74f9-74a0-a87894ddcaff',
+		            'Y23' : 'd3680f55-8ee6-b689-7a02-0e686f59eef4'}
+		for name, urn in expected.items():
+			plate = P005B002(select=Selection(
+				'col={} row={}'.format(name[0], name[1:])))
+			sample, = plate.samples
+			assert get_urn(encode(sample)) == urn, name
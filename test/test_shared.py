@@ -0,0 +1,117 @@
+import pickle
+from collections import OrderedDict
+
+from nose.tools import assert_raises
+
+from pifify.io.input.Faustson import P001B001, P005B002
+from pifify.io.input.plate import Plate
+from pifify.io.input.synthetic import SyntheticPlate
+from pifify.io.output.record import encode, encode_record
+from pifify.io.select import Selection
+from pifify.io.shared import ParameterTable, encode_records
+from pifify.samples import FaustsonSample
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+SELECT = 'row=3:5 col=E:J'
+
+
+class Cells(Plate):
+	"""A plate whose cells take the parameters given to it."""
+	sample_class = FaustsonSample
+
+	def __init__(self, cells, **kwds):
+		super(Cells, self).__init__(**kwds)
+		self._cells = cells
+
+	def cells(self):
+		return [(ord('A'), row) for row in range(1, len(self._cells) + 1)]
+
+	def cell_name(self, col, row):
+		return '{}{:02d}'.format(chr(col), row)
+
+	def cell_parameters(self, col, row):
+		return OrderedDict(self._cells[row - 1])
+
+
+def plates():
+	select = Selection(SELECT)
+	return [P001B001(select=select),
+	        P005B002(select=select, omit=['references']),
+	        SyntheticPlate(3, 2, seed=5, select=select)]
+
+
+def published(plates):
+	table = ParameterTable.publish(plates)
+	try:
+		return [table.params(i)[1] for i in range(len(table))], \
+			[encode(table.sample(i)) for i in range(len(table))]
+	finally:
+		table.close()
+
+
+class TestParameterTable:
+	def test_samples(self):
+		params, samples = published(plates())
+		expected = [p for plate in plates() for p in plate.selected()]
+		assert params == expected
+		assert [[type(v) for v in p.values()] for p in params] == \
+			[[type(v) for v in p.values()] for p in expected]
+		assert samples == [encode(plate.make_sample(p))
+		                   for plate in plates() for p in plate.selected()]
+
+	def test_exact(self):
+		cells = [[('col', 'A'), ('row', 1), ('nlayers', 2**53 + 1),
+		          ('plateMaterial', 'P20 steel, ' * 10),
+		          ('powderSize', (10, 45)), ('virgin', -0.0)],
+		         [('col', u'A'), ('row', 2), ('nlayers', 2**62 + 1),
+		          ('plateMaterial', u'P20 steel'),
+		          ('powderSize', (10., 2**60 + 1)), ('virgin', 0.1)]]
+		plate = Cells(cells)
+		params, samples = published([plate])
+		assert params == plate.selected()
+		assert [type(p['col']) for p in params] == [str, unicode]
+		assert samples == [encode(plate.make_sample(p))
+		                   for p in plate.selected()]
+
+	def test_inexact(self):
+		base = [('col', 'A'), ('row', 1), ('nlayers', 195)]
+		# a float where the first cell holds an integer
+		plate = Cells([base, base[:2] + [('nlayers', 195.5)]])
+		assert_raises(ValueError, ParameterTable.publish, [plate])
+		# a string where the first cell holds a number
+		plate = Cells([base, base[:2] + [('nlayers', '195')]])
+		assert_raises(ValueError, ParameterTable.publish, [plate])
+		# a tuple element that is not held exactly
+		plate = Cells([base + [('powderSize', (10, 45))],
+		               base + [('powderSize', (10.5, 45))]])
+		assert_raises(ValueError, ParameterTable.publish, [plate])
+		# a parameter the first cell does not have
+		plate = Cells([base, base + [('virgin', 100.)]])
+		assert_raises(ValueError, ParameterTable.publish, [plate])
+		# numbers of another kind, held exactly, may share a field
+		plate = Cells([base, base[:2] + [('nlayers', 196.0)]])
+		params, samples = published([plate])
+		assert params == plate.selected()
+		assert type(params[1]['nlayers']) is float
+
+	def test_pickle(self):
+		table = ParameterTable.publish(plates())
+		try:
+			table.array
+			copy = pickle.loads(pickle.dumps(table))
+			assert copy._array is None
+			assert copy.params(3) == table.params(3)
+		finally:
+			table.close()
+
+
+class TestEncodeRecords:
+	def test_parallel(self):
+		serial = [encode_record(sample)
+		          for plate in plates() for sample in plate]
+		parallel = list(encode_records(plates(), jobs=2, chunksize=7))
+		assert len(serial) == 3*18
+		assert parallel == serial
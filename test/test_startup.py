@@ -0,0 +1,80 @@
+import os
+import sys
+import subprocess
+import time
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# modules that short invocations, e.g. --help, must not pay for
+HEAVY = ('numpy', 'pypif', 'tarfile', 'shutil')
+# wall time, in seconds, allowed for `python -m pifify.pifify --help`. It
+# takes ~0.05 s; importing numpy or pypif alone costs ~0.1 s.
+STARTUP_BUDGET = 0.25
+
+# prints the modules loaded by running pifify.pifify with ARGV
+LOADED = """
+import sys, runpy
+sys.argv = ['pifify'] + sys.argv[1:]
+if sys.argv[1:]:
+	try:
+		runpy.run_module('pifify.pifify', run_name='__main__', alter_sys=True)
+	except SystemExit:
+		pass
+else:
+	import pifify.pifify
+sys.stderr.write(' '.join(name for name in sys.modules
+                          if sys.modules[name] is not None))
+"""
+
+
+def python(*args):
+	"""Runs python with ARGS from ROOT; returns (stdout, stderr)."""
+	env = dict(os.environ, PYTHONPATH=ROOT)
+	proc = subprocess.Popen((sys.executable,) + args, cwd=ROOT, env=env,
+	                        stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+	out, err = proc.communicate()
+	assert proc.returncode == 0, err
+	return out, err
+
+
+def loaded(*argv):
+	"""Modules loaded by running pifify.pifify with ARGV, or importing it."""
+	out, err = python('-c', LOADED, *argv)
+	return set(err.split())
+
+
+class TestStartup:
+	def test_import_is_light(self):
+		modules = loaded()
+		for name in HEAVY:
+			assert name not in modules, name
+		inputs = [name for name in modules
+		          if name.startswith('pifify.io.input')]
+		assert not inputs, inputs
+
+	def test_help_is_light(self):
+		modules = loaded('--help')
+		for name in HEAVY:
+			assert name not in modules, name
+		# the registry lists the sources for the help text; the modules
+		# that read them, and the sample classes, stay unloaded
+		inputs = set(name for name in modules
+		             if name.startswith(('pifify.io.input', 'pifify.samples',
+		                                 'pifify.materials')))
+		assert inputs == set(['pifify.io.input',
+		                      'pifify.io.input.registry']), inputs
+
+	def test_help_within_budget(self):
+		best = None
+		for i in range(3):
+			start = time.time()
+			python('-m', 'pifify.pifify', '--help')
+			elapsed = time.time() - start
+			best = elapsed if best is None else min(best, elapsed)
+		assert best < STARTUP_BUDGET, \
+			'--help took {:.3f} s, over the budget of {} s'.format(
+				best, STARTUP_BUDGET)
@@ -0,0 +1,66 @@
+from nose.tools import assert_raises
+
+from pifify.io.stream import Prefetch
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+
+class Plate(object):
+	"""A plate of N samples, named NAME-0, NAME-1, ..."""
+	def __init__(self, name, n):
+		self.samples = ['{}-{}'.format(name, i) for i in range(n)]
+
+	def selected(self):
+		return self.samples
+
+	def __iter__(self):
+		return iter(self.samples)
+
+
+def reader(name, *sizes):
+	return lambda: (Plate('{}{}'.format(name, i), n)
+	                for i, n in enumerate(sizes))
+
+
+def failing():
+	yield Plate('x', 1)
+	raise IOError('unreadable')
+
+
+class TestPrefetch:
+	def test_order(self):
+		stream = Prefetch([('a', reader('a', 2, 3)), ('b', reader('b', 1)),
+		                   ('c', reader('c', 4))], maxsize=1)
+		samples = [sample for plate in stream for sample in plate]
+		assert samples == ['a0-0', 'a0-1', 'a1-0', 'a1-1', 'a1-2', 'b0-0',
+		                   'c0-0', 'c0-1', 'c0-2', 'c0-3']
+		assert [(stats.plates, stats.samples) for stats in stream.stats] == \
+			[(2, 5), (1, 1), (1, 4)]
+
+	def test_error(self):
+		stream = Prefetch([('a', reader('a', 2)), ('x', failing)])
+		assert_raises(IOError, list, stream)
+
+
+class TestTally:
+	def test_serial(self):
+		# records are counted against their sources as they are written,
+		# including sources, or plates, without any samples
+		stream = Prefetch([('a', reader('a', 2, 0, 1)), ('b', reader('b')),
+		                   ('c', reader('c', 0, 2))])
+		records = (sample for plate in stream for sample in plate)
+		written = list(stream.tally(records))
+		assert written == ['a0-0', 'a0-1', 'a2-0', 'c1-0', 'c1-1']
+		assert [stats.records for stats in stream.stats] == [3, 0, 2]
+		assert all(stats.export >= 0. for stats in stream.stats)
+
+	def test_read_ahead(self):
+		# records produced only once the whole stream has been read, as by
+		# worker processes, are counted all the same
+		stream = Prefetch([('a', reader('a', 3)), ('b', reader('b', 2))])
+		records = [sample for plate in stream for sample in plate]
+		assert list(stream.tally(iter(records))) == records
+		assert [stats.records for stats in stream.stats] == [3, 2]
+		assert [stats.samples for stats in stream.stats] == [3, 2]
@@ -0,0 +1,128 @@
+import json
+import os
+import random
+import shutil
+import tempfile
+
+from nose.tools import assert_raises
+
+from pifify.io.input import Faustson
+from pifify.io.input.Faustson import CylinderPlate2mmX4mm
+from pifify.io.input.synthetic import LEVELS, SyntheticPlate, campaign, \
+	laser_settings, parse, write_laser_settings
+from pifify.io.output.record import encode_record
+from pifify.io.select import Selection
+from pifify.samples.validate import validate
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+SELECT = 'row=3:6 col=E:H'
+
+
+def settings_file():
+	"""The laser settings of P005B002, after which synthetic ones are made."""
+	path = os.path.join(os.path.dirname(Faustson.__file__),
+	                    'P005_B002-laser-settings.json')
+	with open(path) as ifs:
+		return json.load(ifs)
+
+
+def exported(plates):
+	"""(parameters, URNs) of every selected sample of PLATES."""
+	params, urns = [], []
+	for plate in plates:
+		for cell in plate.selected():
+			params.append(cell)
+			urns.append(encode_record(plate.make_sample(cell))[0])
+	return params, urns
+
+
+class TestSeed:
+	def test_reproducible(self):
+		select = Selection(SELECT)
+		first = exported(campaign(2, 2, seed=7, select=select))
+		second = exported(campaign(2, 2, seed=7, select=select))
+		assert len(first[1]) == 4*16
+		assert first == second
+
+	def test_plate_on_its_own(self):
+		# any plate of a campaign may be generated without the others
+		select = Selection(SELECT)
+		plates = list(campaign(2, 3, seed=7, select=select))
+		alone = SyntheticPlate(2, 2, seed=7, select=select)
+		assert exported([alone]) == exported([plates[4]])
+		assert alone.treatment == plates[4].treatment
+
+	def test_seeds_differ(self):
+		select = Selection(SELECT)
+		a = exported(campaign(1, 2, seed=7, select=select))
+		b = exported(campaign(1, 2, seed=8, select=select))
+		assert not set(a[1]).intersection(b[1])
+		assert a[0] != b[0]
+
+	def test_plates_differ(self):
+		select = Selection(SELECT)
+		a, b = [exported([plate])[0]
+		        for plate in campaign(1, 2, seed=7, select=select)]
+		assert [params['build'] for params in a + b] == [1]*16 + [2]*16
+		strip = lambda params: dict((key, value)
+		                            for key, value in params.items()
+		                            if key != 'build')
+		assert [strip(params) for params in a] != \
+			[strip(params) for params in b]
+
+
+class TestLaserSettings:
+	def test_levels(self):
+		# every cell of the layout, and every factor, drawn from the levels
+		# of P005_B002-laser-settings.json
+		expected = settings_file()
+		plate = SyntheticPlate(1, 1, seed=3)
+		table = plate.modifications
+		assert sorted(table) == sorted(expected)
+		observed = {}
+		for cell in expected:
+			assert sorted(table[cell]) == sorted(expected[cell]), cell
+			for factor, level in expected[cell].items():
+				observed.setdefault(factor, set()).add(level)
+		assert dict((factor, set(values)) for factor, values in LEVELS) == \
+			observed
+		for factor, values in LEVELS:
+			drawn = set(table[cell][factor] for cell in table)
+			assert drawn == set(values), factor
+
+	def test_round_trip(self):
+		directory = tempfile.mkdtemp()
+		try:
+			path = os.path.join(directory, 'laser-settings.json')
+			table = laser_settings(random.Random(5), sorted(settings_file()))
+			write_laser_settings(path, table)
+			with open(path) as ifs:
+				loaded = json.load(ifs)
+		finally:
+			shutil.rmtree(directory)
+		assert loaded == table
+		# ... and configures a plate as the settings file of P005B002 does
+		class Loaded(CylinderPlate2mmX4mm):
+			settings = (('plate', 5),
+			            ('build', 2))
+			modifications = loaded
+		plate = Loaded()
+		assert plate.problems() == []
+		for params in plate.parameters():
+			name = '{}{:02d}'.format(params['col'], params['row'])
+			for factor, level in loaded[name].items():
+				assert params[factor] == float(level), (name, factor)
+
+
+class TestSource:
+	def test_valid(self):
+		validate(campaign(3, 2, seed=11))
+
+	def test_arguments(self):
+		assert parse('3', '2') == (3, 2, 0)
+		assert parse('3', '2', '9') == (3, 2, 9)
+		for args in ((), ('3',), ('x', '2'), ('3', '2', '9', '1')):
+			assert_raises(ValueError, parse, *args)
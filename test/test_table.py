@@ -0,0 +1,95 @@
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+
+from nose.tools import assert_raises
+
+from pifify.io.input.Faustson import P001B001
+from pifify.io.output.record import encode_record
+from pifify.io.output.table import write_table, write_rows, read_table
+from pifify.io.rows import rows
+from pifify.io.select import Selection
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def plates():
+	return [P001B001(select=Selection('row=3:4 col=C:H'))]
+
+
+class TestTable:
+	def setup(self):
+		self.directory = tempfile.mkdtemp()
+
+	def teardown(self):
+		shutil.rmtree(self.directory)
+
+	def test_round_trip(self):
+		path = os.path.join(self.directory, 'table.arrow')
+		assert write_table(path, plates()) == 10
+		table = read_table(path).to_pydict()
+		assert table['col'][:2] == ['C', 'D']
+		assert table['source'] == ['P001B001']*10
+		assert all(table['annealed'])
+
+	def test_urns_of_records(self):
+		# the table written by the command line, with its records, holds the
+		# URN of the record of each row
+		self.pifify('-s', 'row=3:4 col=C:H', '-o', 'records',
+		            '-t', 'table.arrow', 'faustson-plate1-build1')
+		computed = os.path.join(self.directory, 'computed.arrow')
+		write_table(computed, plates())
+		written = read_table(os.path.join(self.directory, 'table.arrow'))
+		assert written.to_pydict() == read_table(computed).to_pydict()
+		urns = [encode_record(sample)[0]
+		        for plate in plates() for sample in plate]
+		assert written.to_pydict()['urn'] == urns
+		assert sorted(name[:-len('.json')] for name in os.listdir(
+			os.path.join(self.directory, 'records'))) == sorted(urns)
+
+	def test_no_urn(self):
+		assert all('urn' not in row for row in rows(plates(), urn=False))
+
+	def test_partial(self):
+		# a table is not left behind by a failure part way through
+		def failing():
+			for i, row in enumerate(rows(plates())):
+				if i == 5:
+					raise IOError('interrupted')
+				yield row
+		for name in ('partial.arrow', 'partial.parquet'):
+			path = os.path.join(self.directory, name)
+			assert_raises(IOError, write_rows, path, failing(), batch_size=2)
+			assert not os.path.exists(path)
+
+	def test_command_line(self):
+		# an unsupported table is an error before anything is written
+		rc, out, err = self.pifify('-o', 'records', '-t', 'table.csv',
+		                           'faustson-plate1-build1', check=False)
+		assert rc == 2 and 'table.csv' in err, err
+		assert os.listdir(self.directory) == []
+		# a duplicate record removes the records, and the partial table
+		rc, out, err = self.pifify('--duplicate-error', '-s', 'row=3',
+		                           '-o', 'records', '-t', 'table.arrow',
+		                           'faustson-plate1-build1',
+		                           'faustson-plate1-build1', check=False)
+		assert rc == 1 and 'duplicated' in err, err
+		assert os.listdir(self.directory) == []
+
+	def pifify(self, *args, **kwds):
+		"""Runs pifify with ARGS; returns (returncode, stdout, stderr)."""
+		env = dict(os.environ, PYTHONPATH=ROOT)
+		proc = subprocess.Popen(
+			(sys.executable, '-m', 'pifify.pifify') + args,
+			cwd=self.directory, env=env,
+			stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+		out, err = proc.communicate()
+		if kwds.get('check', True):
+			assert proc.returncode == 0, err
+		return proc.returncode, out, err
@@ -0,0 +1,89 @@
+from pifify.io.input.Faustson import CylinderPlate2mmX4mm, P001B001, \
+	P005B002
+from pifify.samples import FaustsonSample
+from pifify.samples.validate import Validator, ValidationError, validate
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+
+class Overrides(CylinderPlate2mmX4mm):
+	settings = (('plate', 9), ('build', 1))
+
+
+def modifications(plate):
+	"""Valid per-cell overrides for every cell on PLATE."""
+	return dict((plate.cell_name(col, row), {'skinOverlap' : '0.16'})
+	            for col, row in plate.cells())
+
+
+def problems(plates):
+	try:
+		validate(plates)
+	except ValidationError as exc:
+		return exc.problems
+	return []
+
+
+class TestValidate:
+	def test_valid(self):
+		assert problems([P001B001(), P005B002()]) == []
+		plate = Overrides()
+		plate.modifications = modifications(plate)
+		assert problems([plate]) == []
+
+	def test_batch(self):
+		# problems with the overrides themselves ...
+		a = Overrides()
+		mods = modifications(a)
+		del mods['M16']
+		mods['Z99'] = {'skinOverlap' : '0.16'}
+		mods['E03']['bogus'] = '1'
+		mods['F03']['skinLaserPower'] = 'fast'
+		a.modifications = mods
+		# ... and with the parameters they produce
+		b = Overrides()
+		b.settings = (('plate', 9), ('build', 2), ('nlayers', 'many'))
+		mods = modifications(b)
+		mods['G04']['skinLaserPower'] = '150'
+		mods['H04']['skinLaserSpeed'] = 'nan'
+		b.modifications = mods
+		found = problems([a, b])
+		a, b = str(a), str(b)
+		expected = [
+			a + ': modifications: no entry for M16',
+			a + ': modifications: Z99 not on the plate',
+			a + ': modifications: unrecognized parameter(s) bogus',
+			a + ": modifications: not a number, F03[skinLaserPower]='fast'",
+			b + ': nlayers: expected int, in A03, A04, A05, A06, A07, ... ' \
+			    '(605 cells)',
+			b + ': skinLaserPower: outside [-100.0, 100.0] %, in G04',
+			b + ': skinLaserSpeed: outside [-100.0, 100.0] %, in H04']
+		assert found == expected, found
+
+	def test_plate(self):
+		plate = Overrides()
+		plate.settings = (('plate', 9), ('speed', 3))
+		plate.treatment = (('melt', (), {}), ('_thermal', (), {}))
+		found = problems([plate])
+		assert 'settings: unrecognized parameter(s) speed' in found[0]
+		assert '"melt" is not a heat treatment step' in found[1]
+		assert '"_thermal" is not a heat treatment step' in found[2]
+		assert 'speed: not a recognized parameter' in found[3]
+		assert len(found) == 4, found
+
+	def test_validator(self):
+		validator = Validator.compile(FaustsonSample)
+		assert Validator.compile(FaustsonSample) is validator
+		params = [{'polar' : 45., 'powderSize' : (10, 45), 'col' : 'A'},
+		          {'polar' : float('nan'), 'powderSize' : (45, 10),
+		           'col' : 1},
+		          {'polar' : True, 'powderSize' : (10,), 'col' : 'C'}]
+		found = validator(params, ['A01', 'B01', 'C01'])
+		assert found == [
+			'col: expected str, in B01',
+			'polar: expected real, in C01',
+			'polar: outside [0.0, 180.0] ${}^\\circ$, in B01',
+			'powderSize: expected range, in C01',
+			'powderSize: outside ordered [0.0, inf] $\\mu$m, in B01'], found
@@ -0,0 +1,114 @@
+from nose.tools import assert_raises
+from pypif import pif
+
+from pifify.io.input.Faustson import P005B002
+from pifify.io.output.record import encode
+from pifify.samples.base import ValueCache, value_factory, property_factory, \
+	shared_values
+
+# To test, simply run
+# [...]$ nosetests (optionally with -v)
+# from the top of the repository.
+
+# scalars that compare equal but are written differently
+SCALARS = (1, 1.0, True, 0, 0.0, -0.0, False, 'P20 steel', u'P20 steel',
+           [10, 45], [10., 45.], [1, 1.0], [0.0, -0.0])
+
+
+def details(sample, name):
+	record = sample.as_dictionary()
+	return [detail for detail in record['preparation'][0]['details']
+	        if detail['name'] == name][0]
+
+
+class TestShared:
+	def test_records_are_independent(self):
+		samples = P005B002().samples[:2]
+		details(samples[0], 'number of layers')['scalars'] = 999
+		assert details(samples[1], 'number of layers')['scalars'] == 195
+		assert details(samples[0], 'number of layers')['scalars'] == 195
+
+	def test_frozen(self):
+		value = value_factory('number of layers')(195)
+		assert_raises(AttributeError, setattr, value, 'scalars', 999)
+		assert_raises(AttributeError, delattr, value, 'scalars')
+		value.as_dictionary()['scalars'] = 999
+		assert value.as_dictionary()['scalars'] == 195
+
+	def test_interned(self):
+		cache = ValueCache()
+		func = value_factory('skin overlap', cache=cache, units='mm')
+		assert func(0.16) is func(0.16)
+		assert func(1) is not func(1.0)
+		assert func(1) is not func(True)
+		assert func.name == 'skin overlap' and func.units == 'mm'
+
+
+class TestOutput:
+	"""Interning must not change a single byte of any record."""
+	def test_values(self):
+		for factory in (value_factory, property_factory):
+			cached = factory('value', cache=ValueCache(), units='%')
+			fresh = factory('value', cache=None, units='%')
+			for x in SCALARS + SCALARS:
+				assert pif.dumps(cached(x)) == pif.dumps(fresh(x)), x
+			assert not isinstance(fresh(1), type(cached(1)))
+
+	def test_types(self):
+		func = value_factory('value', cache=ValueCache())
+		written = [pif.dumps(func(x)) for x in (1, 1.0, True)]
+		assert len(set(written)) == 3, written
+
+	def test_signed_zero(self):
+		# -0.0 == 0.0, and they hash alike, but are written apart
+		fresh = value_factory('value', cache=None)
+		for first, second in ((0.0, -0.0), (-0.0, 0.0)):
+			func = value_factory('value', cache=ValueCache())
+			func(first)
+			assert pif.dumps(func(second)) == pif.dumps(fresh(second))
+			assert func(first) is not func(second)
+		assert '-0.0' in pif.dumps(fresh(-0.0))
+
+	def test_samples(self):
+		plate = P005B002()
+		first = [encode(sample) for sample in plate.samples[:20]]
+		shared_values.clear()
+		second = [encode(sample) for sample in P005B002().samples[:20]]
+		assert first == second
+
+
+class TestValueCache:
+	def create(self, value):
+		self.created.append(value)
+		return value
+
+	def setup(self):
+		self.created = []
+
+	def test_lru(self):
+		cache = ValueCache(maxsize=2)
+		assert cache.get('a', lambda: self.create('A')) == 'A'
+		assert cache.get('b', lambda: self.create('B')) == 'B'
+		# a is now the most recently used, so b is evicted
+		assert cache.get('a', lambda: self.create('X')) == 'A'
+		assert cache.get('c', lambda: self.create('C')) == 'C'
+		assert len(cache) == 2
+		assert cache.get('a', lambda: self.create('X')) == 'A'
+		assert cache.get('b', lambda: self.create('B2')) == 'B2'
+		assert self.created == ['A', 'B', 'C', 'B2']
+		assert (cache.hits, cache.misses) == (2, 4)
+		cache.clear()
+		assert len(cache) == 0 and cache.hits == cache.misses == 0
+
+	def test_unhashable(self):
+		cache = ValueCache()
+		assert cache.get(['a'], lambda: self.create(1)) == 1
+		assert cache.get(['a'], lambda: self.create(2)) == 2
+		assert len(cache) == 0 and self.created == [1, 2]
+		# values of unhashable scalars are built afresh, and written alike
+		func = value_factory('value', cache=cache)
+		x = {'minimum' : 1, 'maximum' : 2}
+		assert func(x) is not func(x)
+		assert pif.dumps(func(x)) == \
+			pif.dumps(value_factory('value', cache=None)(x))
+		assert len(cache) == 0